@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.db.database import get_SessionLocal
+from app.service.house import read_house_rows
+from app.service.recommender import HouseIndex
+
+# 추천 인덱스를 미리 만들어 HOUSE_INDEX_PATH에 저장합니다.
+# 서버 워커들은 시작할 때 이 파일을 mmap으로 열기만 하면 됩니다.
+#
+#   python -m app.cli.build_index --source db
+#   python -m app.cli.build_index --source jsonl --data app/service/apartment_info.jsonl
+
+
+async def build_from_db() -> HouseIndex:
+    async with get_SessionLocal()() as db:
+        return await HouseIndex.from_db(db)
+
+
+def build_from_jsonl(path: str) -> HouseIndex:
+    # 빈 db에 /house/initailize로 넣었을 때와 같은 순서로 id를 붙입니다.
+    # jsonl로 만든 인덱스는 카탈로그 번호가 0이라서, db의 번호와 다르면 서버가 인덱스를 다시 만듭니다.
+    stats = {"read": 0, "skipped": 0, "invalid": 0}
+    source_ids = set()
+    houses = []
+    for row in read_house_rows(path, stats):
+        if row["source_id"] in source_ids:
+            continue
+        source_ids.add(row["source_id"])
+        row["id"] = len(houses) + 1
+        houses.append(row)
+    return HouseIndex.build(houses) if houses else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 인덱스 생성")
+    parser.add_argument("--source", choices=["db", "jsonl"], default="db")
+    parser.add_argument("--data", default=settings.HOUSE_DATA_PATH)
+    parser.add_argument("--out", default=settings.HOUSE_INDEX_PATH)
+    args = parser.parse_args()
+    if not args.out:
+        parser.error("--out 또는 HOUSE_INDEX_PATH를 지정해주세요.")
+
+    start = time.perf_counter()
+    house_index = asyncio.run(build_from_db()) if args.source == "db" else build_from_jsonl(args.data)
+    if house_index is None:
+        raise SystemExit("인덱스를 만들 집 데이터가 없습니다.")
+    version = house_index.save(args.out)
+    print(f"추천 인덱스 저장: {args.out}/{version} (집 {len(house_index.houses)}개, "
+          f"카탈로그 {house_index.catalog_version}, {time.perf_counter() - start:.1f}초)")
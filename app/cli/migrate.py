@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import inspect, select, text, update
+
+from app.core.config import settings
+from app.db.database import engine, get_SessionLocal, create_schema, comparable_value
+from app.db.models import get_Base, House, CatalogRevision
+from app.service.house import HOUSE_ROW_TYPES, read_house_rows
+
+# 이미 운영 중인 db를 현재 모델에 맞춥니다. create_all은 새 테이블만 만들고
+# 기존 테이블에 컬럼을 추가하지 않으므로, 추가된 컬럼은 여기서 직접 만들고 채웁니다.
+#
+#   python -m app.cli.migrate
+#   python -m app.cli.migrate --data app/service/apartment_info.jsonl
+
+CONTENT_COLUMNS = list(HOUSE_ROW_TYPES) + ["image_url"]
+
+
+def content_key(house: dict) -> str:
+    # db에서 읽은 값과 원본 값을 같은 형태로 맞춥니다.
+    return json.dumps({
+        column: comparable_value(house[column]) for column in CONTENT_COLUMNS
+    }, ensure_ascii=False, sort_keys=True, default=str)
+
+
+async def add_source_id_column() -> bool:
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(lambda sync_conn: [
+            column["name"] for column in inspect(sync_conn).get_columns(House.__tablename__)
+        ])
+        if "source_id" in columns:
+            return False
+        await conn.execute(text('ALTER TABLE House ADD COLUMN source_id INTEGER NULL'))
+        await conn.execute(text('CREATE UNIQUE INDEX uq_House_source_id ON House (source_id)'))
+    return True
+
+
+def create_missing_indexes(sync_conn) -> list:
+    # create_all은 이미 있는 테이블의 인덱스를 만들지 않으므로, 모델에 있는데 db에 없는 인덱스를 만듭니다.
+    inspector = inspect(sync_conn)
+    table_names = set(inspector.get_table_names())
+    created = []
+    for table in get_Base().metadata.sorted_tables:
+        if table.name not in table_names:
+            continue
+        index_names = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in index_names:
+                index.create(sync_conn)
+                created.append(index.name)
+    return created
+
+
+async def backfill_source_ids(path: str) -> int:
+    # source_id가 없는 집을 원본 데이터와 내용으로 맞춰서 채웁니다.
+    # 같은 내용의 매물이 여러 개면 id 순서대로 원본 순서와 짝지읍니다.
+    async with get_SessionLocal()() as db:
+        houses = (await db.execute(select(House.id, *[getattr(House, column) for column in CONTENT_COLUMNS]).filter(
+            House.source_id == None
+        ).order_by(House.id))).all()
+        used_source_ids = set(await db.scalars(select(House.source_id).filter(House.source_id != None)))
+
+        updates = []
+        if houses:
+            source_ids = {}
+            for row in read_house_rows(path, {"read": 0, "skipped": 0, "invalid": 0}):
+                if row["source_id"] not in used_source_ids:
+                    source_ids.setdefault(content_key(row), []).append(row["source_id"])
+            for house in houses:
+                candidates = source_ids.get(content_key(house._asdict()))
+                if candidates:
+                    updates.append({"id": house.id, "source_id": candidates.pop(0)})
+        if updates:
+            await db.execute(update(House), updates)
+
+        # 카탈로그 번호 행을 미리 만들어 두어 첫 번호 증가끼리 충돌하지 않게 합니다.
+        if await db.get(CatalogRevision, 1) is None:
+            db.add(CatalogRevision(id=1, revision=0))
+        await db.commit()
+        return len(updates)
+
+
+async def migrate(path: str) -> None:
+    await create_schema()
+    if await add_source_id_column():
+        print("House.source_id 컬럼을 추가했습니다.")
+    async with engine.begin() as conn:
+        for index_name in await conn.run_sync(create_missing_indexes):
+            print(f"인덱스를 만들었습니다: {index_name}")
+    print(f"House.source_id {await backfill_source_ids(path)}건을 채웠습니다.")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="db 마이그레이션")
+    parser.add_argument("--data", default=settings.HOUSE_DATA_PATH)
+    args = parser.parse_args()
+    asyncio.run(migrate(args.data))
@@ -0,0 +1,38 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+# 프로세스 내 LRU + TTL 캐시입니다. (이벤트 루프 스레드에서만 사용합니다.)
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+
+    def get(self, key, default: Any = None) -> Any:
+        item = self.data.get(key)
+        if item is None:
+            return default
+        value, expire_at = item
+        if expire_at <= time.monotonic():
+            del self.data[key]
+            return default
+        self.data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        self.data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key, default: Any = None) -> Any:
+        item = self.data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def __len__(self) -> int:
+        return len(self.data)
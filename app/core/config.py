@@ -4,8 +4,61 @@ class Settings(BaseSettings):
     SERVER_TYPE: str
     ROOT_PATH: str
     DB_URL: str
+    DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 3600
+    DB_CREATE_SCHEMA: bool = False
     REDIS_URL: str
+    REDIS_BACKEND: str = "redis"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
     HOUSE_REC_URL: str
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_WORKERS: int = 0
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: float = 60.0
+    HOUSE_INDEX_PATH: str = ""
+    HOUSE_INDEX_CHECK_INTERVAL: float = 5.0
+    HOUSE_DATA_PATH: str = "app/service/apartment_info.jsonl"
+    HOUSE_INGEST_BATCH_SIZE: int = 1000
+    HOUSE_PAGE_SIZE: int = 5
+    HOUSE_PAGE_SIZE_MAX: int = 50
+    HOUSE_DETAIL_BATCH_MAX: int = 50
+    LIKE_CACHE_TTL: int = 86400
+    LIKE_FLUSH_INTERVAL: float = 1.0
+    LIKE_FLUSH_BATCH_SIZE: int = 500
+    RECOMMEND_WORKERS: int = 0
+    RECOMMEND_QUEUE_SIZE: int = 32
+    HOUSE_REC_CONNECT_TIMEOUT: float = 3.0
+    HOUSE_REC_READ_TIMEOUT: float = 60.0
+    HOUSE_REC_MAX_CONNECTIONS: int = 10
+    HOUSE_REC_MAX_RETRIES: int = 3
+    HOUSE_REC_BACKOFF_BASE: float = 0.5
+    HOUSE_REC_BACKOFF_MAX: float = 8.0
+    HOUSE_REC_BREAKER_THRESHOLD: int = 5
+    HOUSE_REC_BREAKER_RESET: float = 30.0
+    HOUSE_REC_CACHE_TTL: int = 3600
+    HOUSE_REC_LOCK_TTL: float = 120.0
+    HOUSE_REC_LOCK_POLL_INTERVAL: float = 0.1
+    CHAT_JOB_WORKERS: int = 4
+    CHAT_JOB_QUEUE_SIZE: int = 100
+    CHAT_JOB_MAX_PER_USER: int = 2
+    CHAT_JOB_TTL: int = 3600
+    CHAT_JOB_ACTIVE_TTL: int = 600
+    CHAT_JOB_POLL_INTERVAL: float = 0.5
+    CHAT_MAX_CONCURRENCY: int = 8
+    CHAT_RATE_LIMIT: float = 0.2
+    CHAT_RATE_BURST: int = 5
+    CHAT_ADMISSION_QUEUE_SIZE: int = 16
+    CHAT_ADMISSION_TIMEOUT: float = 10.0
+    CHAT_JOB_ADMISSION_TIMEOUT: float = 120.0
+    CHAT_ADMISSION_POLL_INTERVAL: float = 0.1
+    CHAT_ADMISSION_SLOT_TTL: float = 300.0
+    CHAT_ADMISSION_RETRY_AFTER: int = 5
+    WARMUP_RETRY_INTERVAL: float = 2.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,34 @@
+import time
+from typing import Optional
+
+
+# 워커 준비 상태입니다. 프로세스가 떠 있으면 live이고, warmup이 끝나야 ready가 됩니다.
+class Readiness:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.checks = {}
+        self.ready = False
+        self.ready_after: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def mark(self, name: str) -> None:
+        self.checks[name] = True
+
+    def fail(self, error: Exception) -> None:
+        self.last_error = repr(error)
+
+    def set_ready(self) -> None:
+        self.ready = True
+        self.ready_after = time.monotonic() - self.started_at
+        self.last_error = None
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "checks": dict(self.checks),
+            "ready_after": self.ready_after,
+            "last_error": self.last_error,
+        }
+
+
+readiness = Readiness()
@@ -0,0 +1,133 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.stats import cache_stats
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "요청 처리 시간",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "상태 코드별 요청 수",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "처리 중인 요청 수",
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "요청당 db 쿼리 수",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+CHAT_STAGE_LATENCY = Histogram(
+    "chat_stage_duration_seconds",
+    "/chat 추천 파이프라인 단계별 처리 시간",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+RERANK_COALESCED = Counter(
+    "rerank_coalesced_total",
+    "같은 입력의 추천 모델 호출을 기다려 결과를 함께 받은 요청 수",
+    ["scope"],
+)
+CHAT_ADMISSION_ACTIVE = Gauge(
+    "chat_admission_active",
+    "서비스 전체에서 실행 중인 /chat 파이프라인 수 (마지막으로 확인한 값)",
+)
+CHAT_ADMISSION_WAITING = Gauge(
+    "chat_admission_waiting",
+    "/chat 슬롯을 기다리는 요청 수",
+)
+CHAT_ADMISSION_SHED = Counter(
+    "chat_admission_shed_total",
+    "입장 제어로 거절한 /chat 요청 수",
+    ["reason"],
+)
+
+# 요청마다 db 쿼리 수를 세는 카운터 (SQLAlchemy 이벤트에서 증가시킵니다)
+db_query_count = contextvars.ContextVar("db_query_count", default=None)
+
+
+def count_db_query(*args) -> None:
+    counter = db_query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def stage_timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        CHAT_STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    # BaseHTTPMiddleware보다 가벼운 순수 ASGI 미들웨어입니다.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = db_query_count.set([0])
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            # 경로 파라미터별로 라벨이 늘어나지 않도록 라우트 템플릿을 사용합니다.
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUEST_COUNT.labels(method, route, str(status_code)).inc()
+            DB_QUERIES.labels(route).observe(db_query_count.get()[0])
+            db_query_count.reset(token)
+
+
+class StatsCollector:
+    # 스크랩할 때 캐시 카운터와 Redis 풀 상태를 읽어 옵니다.
+    def __init__(self, redis_pool_stats):
+        self.redis_pool_stats = redis_pool_stats
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "캐시 적중 수", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "캐시 미스 수", labels=["cache"])
+        for name, counter in cache_stats.items():
+            hits.add_metric([name], counter.hits)
+            misses.add_metric([name], counter.misses)
+        yield hits
+        yield misses
+
+        pool = GaugeMetricFamily("redis_pool_connections", "Redis 연결 풀 상태", labels=["state"])
+        for state, value in self.redis_pool_stats().items():
+            if isinstance(value, int):
+                pool.add_metric([state], value)
+        yield pool
+
+
+def register_stats_collector(redis_pool_stats) -> None:
+    REGISTRY.register(StatsCollector(redis_pool_stats))
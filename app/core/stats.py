@@ -0,0 +1,26 @@
+# 프로세스 내 캐시 적중/미스 카운터입니다.
+class HitMissCounter:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self, count: int = 1) -> None:
+        self.hits += count
+
+    def miss(self, count: int = 1) -> None:
+        self.misses += count
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+cache_stats = {}
+
+
+def get_cache_stats(name: str) -> HitMissCounter:
+    return cache_stats.setdefault(name, HitMissCounter())
@@ -1,50 +1,206 @@
 import json
+import time
+from typing import Optional
 
 import jwt
 from fastapi import HTTPException, status, Depends
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import select, insert, event, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import count_db_query, register_stats_collector
+from app.core.stats import get_cache_stats
+from app.db.memory_redis import MemoryRedis, register_script
 from app.db.models import get_Base, User
 import aioredis
 from fastapi.security.api_key import APIKeyHeader
 api_key_header_auth = APIKeyHeader(name="Authorization", auto_error=False)
 
 
-DB_URL = f'mysql+pymysql://root:0000@{settings.DB_URL}/sarabwayu'
-engine = create_engine(DB_URL, pool_recycle=3600)
+# DATABASE_URL을 지정하면 (예: sqlite+aiosqlite:///./local.db) MySQL 대신 사용합니다.
+DB_URL = settings.DATABASE_URL or f'mysql+aiomysql://root:0000@{settings.DB_URL}/sarabwayu'
+
+def get_engine_options(db_url: str) -> dict:
+    if db_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+engine = create_async_engine(DB_URL, **get_engine_options(DB_URL))
+event.listen(engine.sync_engine, "before_cursor_execute", count_db_query)
 
 Base = get_Base()
 def get_Base():
     return Base
 
-# Base.metadata.drop_all(bind=engine) # 테이블 변경 사항 있을 시 주석 제거
-Base.metadata.create_all(bind=engine)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async def create_schema() -> None:
+    async with engine.begin() as conn:
+        # await conn.run_sync(Base.metadata.drop_all) # 테이블 변경 사항 있을 시 주석 제거
+        await conn.run_sync(Base.metadata.create_all)
+
+async def ping_db() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def dispose_engine() -> None:
+    await engine.dispose()
+
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 def get_SessionLocal():
     return SessionLocal
 
+# 프로세스 전체에서 하나의 Redis 연결 풀을 공유합니다.
+redis_pool: Optional[aioredis.BlockingConnectionPool] = None
+redis_client: Optional[aioredis.Redis] = None
+
+def create_redis_client() -> aioredis.Redis:
+    global redis_pool, redis_client
+    if redis_client is not None:
+        return redis_client
+
+    # 테스트/벤치마크에서는 REDIS_BACKEND=memory로 Redis 서버 없이 실행합니다.
+    if settings.REDIS_BACKEND == "memory":
+        redis_client = MemoryRedis()
+        return redis_client
+
+    redis_pool = aioredis.BlockingConnectionPool.from_url(
+        f"redis://{settings.REDIS_URL}:6379/0",
+        encoding="utf-8",
+        decode_responses=True,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    redis_client = aioredis.Redis(connection_pool=redis_pool)
+    return redis_client
+
+def set_redis_client(client) -> None:
+    # 테스트/벤치마크에서 다른 Redis 구현으로 교체할 때 사용합니다.
+    global redis_client
+    redis_client = client
+
+async def close_redis_client() -> None:
+    global redis_pool, redis_client
+    if redis_client is not None:
+        await redis_client.close()
+    if redis_pool is not None:
+        await redis_pool.disconnect()
+    redis_pool = None
+    redis_client = None
+
+def redis_pool_stats() -> dict:
+    if redis_pool is None:
+        return {"backend": settings.REDIS_BACKEND}
+    # BlockingConnectionPool은 비어 있는 자리를 None으로 채워 두므로 남은 자리 수로 사용 중인 연결을 계산합니다.
+    available = redis_pool.pool.qsize()
+    return {
+        "backend": settings.REDIS_BACKEND,
+        "max_connections": redis_pool.max_connections,
+        "created_connections": len(redis_pool._connections),
+        "in_use_connections": redis_pool.max_connections - available,
+        "available_slots": available,
+    }
+
+register_stats_collector(redis_pool_stats)
+
 async def get_redis_client() -> aioredis.Redis:
-    redis = aioredis.from_url(f"redis://{settings.REDIS_URL}:6379/0", encoding="utf-8", decode_responses=True)
-    try:
-        yield redis
-    finally:
-        await redis.close()
+    return create_redis_client()
 
-def get_db() -> Session:
-    db = SessionLocal()
-    try:
+# SET NX로 잡은 잠금을 자신이 잡은 경우에만 풉니다.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+@register_script(RELEASE_LOCK_SCRIPT)
+async def release_lock_in_memory(redis, keys: list, args: list) -> int:
+    if await redis.get(keys[0]) == args[0]:
+        return await redis.delete(keys[0])
+    return 0
+
+async def get_db() -> AsyncSession:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
-def save_db(data, db):
+async def save_db(data, db: AsyncSession):
     try:
         db.add(data)
-        db.commit()
-        db.refresh(data)
+        await db.commit()
+        await db.refresh(data)
         return data
     except:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="데이터베이스에 오류가 발생했습니다."
+        )
+
+
+async def bulk_insert_db(model, rows: list, db: AsyncSession) -> int:
+    # 여러 행을 한 트랜잭션, 한 INSERT 문으로 저장합니다. 실패하면 전부 롤백됩니다.
+    if not rows:
+        return 0
+    try:
+        await db.execute(insert(model), rows)
+        await db.commit()
+        return len(rows)
+    except:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="데이터베이스에 오류가 발생했습니다."
+        )
+
+
+DIALECT_INSERTS = {"mysql": mysql.insert, "postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def comparable_value(value):
+    # MySQL FLOAT는 단정밀도라서 읽은 값이 저장한 값과 조금 다르므로 반올림해서 비교합니다.
+    return round(value, 4) if isinstance(value, float) else value
+
+
+async def upsert_db(model, rows: list, key: str, db: AsyncSession, on_change=None) -> int:
+    # key 컬럼(unique)이 같은 행이 있으면 내용을 갱신하고, 없으면 새로 넣습니다.
+    # 같은 key의 행을 먼저 읽어서 새 행이거나 내용이 다른 행만 씁니다.
+    # 바뀐 행 수를 rowcount로 세지 않으므로 db 종류와 관계없이 같습니다.
+    # (aiomysql은 CLIENT.FOUND_ROWS를 켜므로 ON DUPLICATE KEY UPDATE는 내용이 같은 행도 1로 셉니다)
+    # 쓰기는 한 문장이라 여러 워커가 동시에 실행해도 중복 행이 생기지 않습니다.
+    # 바뀐 행이 있으면 같은 트랜잭션에서 on_change(db)를 실행합니다.
+    if not rows:
+        return 0
+    table = model.__table__
+    columns = [column for column in rows[0] if column != key]
+    try:
+        existing = {row[key]: row for row in (await db.execute(
+            select(*[table.c[column] for column in rows[0]]).filter(table.c[key].in_([row[key] for row in rows]))
+        )).mappings()}
+        changed_rows = [row for row in rows if row[key] not in existing or any(
+            comparable_value(row[column]) != comparable_value(existing[row[key]][column]) for column in columns
+        )]
+        if changed_rows:
+            statement = DIALECT_INSERTS[db.bind.dialect.name](table).values(changed_rows)
+            if db.bind.dialect.name == "mysql":
+                statement = statement.on_duplicate_key_update({column: statement.inserted[column] for column in columns})
+            else:
+                statement = statement.on_conflict_do_update(
+                    index_elements=[key],
+                    set_={column: statement.excluded[column] for column in columns},
+                )
+            await db.execute(statement)
+            if on_change is not None:
+                await on_change(db)
+        await db.commit()
+        return len(changed_rows)
+    except:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="데이터베이스에 오류가 발생했습니다."
@@ -62,44 +218,70 @@ async def user_to_json(user):
     )
 
 
+# 요청마다 Redis/DB에 가지 않도록 토큰과 사용자 정보를 프로세스 내에 짧게 캐싱합니다.
+# 다른 워커의 캐시는 USER_CACHE_TTL이 지나면 갱신됩니다.
+token_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+user_local_cache_stats = get_cache_stats("user_local")
+user_redis_cache_stats = get_cache_stats("user_redis")
+
+async def invalidate_user_cache(redis: aioredis.Redis, nickname: str) -> None:
+    # 사용자 정보가 바뀌면 호출합니다.
+    user_cache.pop(nickname)
+    await redis.delete(f"user:{nickname}")
+
+
+def unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Unauthorized",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 async def get_current_user(
     api_key: str = Depends(api_key_header_auth),
-    db: Session = Depends(get_db),
     redis: aioredis.Redis = Depends(get_redis_client)
 ) -> User:
 
     if api_key is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise unauthorized()
     token = api_key.replace("Bearer ", "")
-    if token is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    try:
-        payload = jwt.decode(token, "sarabwayu", algorithms=["HS256"])
-    except:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
+    if not token:
+        raise unauthorized()
 
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, "sarabwayu", algorithms=["HS256"])
+        except:
+            raise unauthorized()
+        # 만료 시각이 지난 토큰이 캐시에 남지 않도록 TTL을 제한합니다.
+        token_cache.set(token, payload, ttl=min(settings.USER_CACHE_TTL, payload["exp"] - time.time()))
 
     nickname: str = payload.get("sub")
+    user_info = user_cache.get(nickname)
+    if user_info is not None:
+        user_local_cache_stats.hit()
+        return User(**user_info)
+    user_local_cache_stats.miss()
+
     user_info = await redis.get(f"user:{nickname}")
     if user_info:
-        return User(**json.loads(user_info))
+        user_redis_cache_stats.hit()
+        user_info = json.loads(user_info)
+    else:
+        user_redis_cache_stats.miss()
 
-    user = db.query(User).filter(User.nickname == nickname).first()
+        # 두 캐시에 모두 없을 때만 db 세션을 엽니다.
+        async with SessionLocal() as db:
+            user = await db.scalar(select(User).filter(User.nickname == nickname))
+        if user is None:
+            raise unauthorized()
 
-    await redis.set(f"user:{nickname}", await user_to_json(user), ex=3600)
+        user_info = await user_to_json(user)
+        await redis.set(f"user:{nickname}", user_info, ex=3600)
+        user_info = json.loads(user_info)
 
-    return user
\ No newline at end of file
+    user_cache.set(nickname, user_info)
+    return User(**user_info)
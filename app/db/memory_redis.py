@@ -0,0 +1,238 @@
+import fnmatch
+import time
+from typing import Optional
+
+# Lua 스크립트 원문 -> 같은 동작을 하는 파이썬 구현 (eval에서 사용합니다)
+SCRIPTS = {}
+
+
+def register_script(script: str):
+    # Lua 스크립트를 쓰는 모듈에서 MemoryRedis용 구현을 함께 등록합니다.
+    # 구현은 await 사이에 다른 코루틴이 끼어들지 않으므로 Redis처럼 원자적으로 실행됩니다.
+    def decorator(handler):
+        SCRIPTS[script] = handler
+        return handler
+    return decorator
+
+
+# 테스트와 벤치마크에서 Redis 서버 대신 사용하는 프로세스 내 Redis 대체 구현입니다.
+# 서비스에서 사용하는 명령만 aioredis와 같은 형태(decode_responses=True)로 지원합니다.
+class MemoryRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key: str) -> bool:
+        expire_at = self.expires.get(key)
+        if expire_at is not None and expire_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _get(self, key: str, default=None):
+        return self.data[key] if self._alive(key) else default
+
+    def _set_expire(self, key: str, ex: Optional[float] = None, px: Optional[float] = None) -> None:
+        if ex is not None:
+            self.expires[key] = time.monotonic() + ex
+        elif px is not None:
+            self.expires[key] = time.monotonic() + px / 1000
+        else:
+            self.expires.pop(key, None)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+    async def flushall(self) -> bool:
+        self.data.clear()
+        self.expires.clear()
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._get(key)
+
+    async def mget(self, keys, *args) -> list:
+        keys = [keys, *args] if isinstance(keys, str) else list(keys) + list(args)
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value, ex=None, px=None, nx: bool = False, xx: bool = False, keepttl: bool = False):
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.data[key] = value if isinstance(value, (str, bytes)) else str(value)
+        if not keepttl:
+            self._set_expire(key, ex, px)
+        return True
+
+    async def delete(self, *keys) -> int:
+        count = 0
+        for key in keys:
+            if self._alive(key):
+                count += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return count
+
+    async def rename(self, src: str, dst: str) -> bool:
+        if not self._alive(src):
+            raise ValueError("no such key")
+        self.data[dst] = self.data.pop(src)
+        self.expires.pop(dst, None)
+        if src in self.expires:
+            self.expires[dst] = self.expires.pop(src)
+        return True
+
+    async def exists(self, *keys) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    async def keys(self, pattern: str = "*") -> list:
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        if not self._alive(key):
+            return False
+        self._set_expire(key, ex=seconds)
+        return True
+
+    async def pexpire(self, key: str, milliseconds: float) -> bool:
+        if not self._alive(key):
+            return False
+        self._set_expire(key, px=milliseconds)
+        return True
+
+    async def ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        if key not in self.expires:
+            return -1
+        return int(self.expires[key] - time.monotonic())
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._get(key, 0)) + amount
+        self.data[key] = str(value)
+        return value
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    async def decr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, -amount)
+
+    def _set_of(self, key: str, create: bool = False) -> set:
+        members = self._get(key)
+        if members is None:
+            members = set()
+            if create:
+                self.data[key] = members
+        return members
+
+    async def sadd(self, key: str, *members) -> int:
+        current = self._set_of(key, create=True)
+        added = {str(member) for member in members} - current
+        current.update(added)
+        return len(added)
+
+    async def srem(self, key: str, *members) -> int:
+        current = self._set_of(key)
+        removed = {str(member) for member in members} & current
+        current.difference_update(removed)
+        if not current:
+            await self.delete(key)
+        return len(removed)
+
+    async def smembers(self, key: str) -> set:
+        return set(self._set_of(key))
+
+    async def sismember(self, key: str, member) -> bool:
+        return str(member) in self._set_of(key)
+
+    async def smismember(self, key: str, members, *args) -> list:
+        members = list(members) + list(args) if isinstance(members, (list, tuple)) else [members, *args]
+        current = self._set_of(key)
+        return [1 if str(member) in current else 0 for member in members]
+
+    async def scard(self, key: str) -> int:
+        return len(self._set_of(key))
+
+    async def spop(self, key: str, count: Optional[int] = None):
+        current = self._set_of(key)
+        popped = [current.pop() for _ in range(min(count or 1, len(current)))]
+        if not current:
+            await self.delete(key)
+        return popped if count is not None else (popped[0] if popped else None)
+
+    def _hash_of(self, key: str, create: bool = False) -> dict:
+        fields = self._get(key)
+        if fields is None:
+            fields = {}
+            if create:
+                self.data[key] = fields
+        return fields
+
+    async def hset(self, name: str, key=None, value=None, mapping: Optional[dict] = None) -> int:
+        items = dict(mapping or {})
+        if key is not None:
+            items[key] = value
+        fields = self._hash_of(name, create=True)
+        added = sum(1 for field in items if str(field) not in fields)
+        fields.update({str(field): str(value) for field, value in items.items()})
+        return added
+
+    async def hsetnx(self, name: str, key, value) -> bool:
+        fields = self._hash_of(name, create=True)
+        if str(key) in fields:
+            return False
+        fields[str(key)] = str(value)
+        return True
+
+    async def hget(self, name: str, key) -> Optional[str]:
+        return self._hash_of(name).get(str(key))
+
+    async def hgetall(self, name: str) -> dict:
+        return dict(self._hash_of(name))
+
+    async def hdel(self, name: str, *keys) -> int:
+        fields = self._hash_of(name)
+        removed = sum(1 for key in keys if fields.pop(str(key), None) is not None)
+        if not fields:
+            await self.delete(name)
+        return removed
+
+    async def hlen(self, name: str) -> int:
+        return len(self._hash_of(name))
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args):
+        handler = SCRIPTS.get(script)
+        if handler is None:
+            raise NotImplementedError("MemoryRedis에 등록되지 않은 Lua 스크립트입니다.")
+        return await handler(self, list(keys_and_args[:numkeys]), [str(arg) for arg in keys_and_args[numkeys:]])
+
+    def pipeline(self, transaction: bool = True) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis: MemoryRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.commands = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self.redis, name)
+
+        def queue(*args, **kwargs) -> "MemoryPipeline":
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        commands, self.commands = self.commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, String, Boolean, DateTime, func, JSON, Date, FLOAT
+from sqlalchemy import Column, Integer, Text, ForeignKey, String, Boolean, DateTime, func, JSON, Date, FLOAT, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import pytz
@@ -41,8 +41,23 @@ class House(Base):
     studentCountPerTeacher = Column(FLOAT, nullable=False)
     url = Column(String(100), nullable=False)
     image_url = Column(String(200), nullable=True)
+    # 원본 데이터(apartment_info.jsonl)의 id. /house/initailize에서 이 값으로 중복을 판단합니다.
+    source_id = Column(Integer, unique=True, nullable=True)
     is_deleted = Column(Boolean, default=False)
 
+    # /chat 추천 후보를 고를 때 거리/주차 조건을 인덱스만으로 거를 수 있게 합니다.
+    __table_args__ = (
+        Index('ix_House_is_deleted_walkTime_parking', 'is_deleted', 'walkTime', 'aptParkingCountPerHousehold'),
+    )
+
+class CatalogRevision(Base):
+    # 집 데이터가 바뀔 때마다 올리는 카탈로그 번호입니다. (id=1 한 행만 사용합니다)
+    # 추천 인덱스가 db와 같은 내용인지 판단할 때 사용합니다.
+    __tablename__ = 'CatalogRevision'
+
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+
 class Recommendation(Base):
     __tablename__ = 'Recommendation'
 
@@ -53,6 +68,13 @@ class Recommendation(Base):
     is_deleted = Column(Boolean, default=False)
     create_date = Column(DateTime, default=get_now())
 
+    # 사용자별 추천 목록을 id 순서로 페이지네이션할 때 사용합니다.
+    __table_args__ = (
+        Index('ix_Recommendation_user_id_id', 'user_id', 'id'),
+        # 이미 추천된 집을 제외하는 anti-join에서 사용합니다.
+        Index('ix_Recommendation_user_id_house_id', 'user_id', 'house_id', 'is_deleted'),
+    )
+
 class LikedHouse(Base):
     __tablename__ = 'LikedHouse'
 
@@ -1,16 +1,48 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from app.schemas.request import Chat
 from app.schemas.response import ApiResponse
+from app.service.admission import admit_chat
 from app.service.chat import ChatService
+from app.service.chat_job import ChatJobService
 
 router = APIRouter(prefix="/chat")
 
 @router.post("", response_model=ApiResponse, tags=["Chat"])
 async def post_chat(
+    chat_data: Chat,
+    chat_job_service: Annotated[ChatJobService, Depends()]
+):
+    return ApiResponse(
+        data=await chat_job_service.submit(chat_data)
+    )
+
+@router.post("/sync", response_model=ApiResponse, tags=["Chat"], dependencies=[Depends(admit_chat)])
+async def post_chat_sync(
     chat_data: Chat,
     chat_service: Annotated[ChatService, Depends()]
 ):
     return ApiResponse(
         data=await chat_service.chat(chat_data)
-    )
\ No newline at end of file
+    )
+
+@router.get("/{job_id}", response_model=ApiResponse, tags=["Chat"])
+async def get_chat_job(
+    job_id: str,
+    chat_job_service: Annotated[ChatJobService, Depends()]
+):
+    return ApiResponse(
+        data=await chat_job_service.get(job_id)
+    )
+
+@router.get("/{job_id}/events", tags=["Chat"])
+async def get_chat_job_events(
+    job_id: str,
+    chat_job_service: Annotated[ChatJobService, Depends()]
+):
+    return StreamingResponse(
+        await chat_job_service.events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
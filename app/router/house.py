@@ -1,9 +1,10 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, Query
 
+from app.core.config import settings
 from app.schemas.request import House
-from app.schemas.response import ApiResponse
+from app.schemas.response import ApiResponse, api_response
 from app.service.house import HouseService
 
 router = APIRouter(prefix="/house")
@@ -12,15 +13,14 @@ router = APIRouter(prefix="/house")
 async def get_house_initailize(
     house_service: Annotated[HouseService, Depends()]
 ):
-    await house_service.initailize()
-    return ApiResponse()
+    return ApiResponse(data=await house_service.initailize())
 
 @router.post("/create", response_model=ApiResponse, tags=["House"])
 async def post_house_create(
     house_data: House,
     house_service: Annotated[HouseService, Depends()]
 ):
-    return ApiResponse(data=await house_service.create(house_data))
+    return ApiResponse(data=await house_service.create(house_data.house_info))
 @router.patch("/like/{house_id}", response_model=ApiResponse, tags=["House"])
 async def patch_house_like(
     house_id: int,
@@ -28,12 +28,28 @@ async def patch_house_like(
 ):
     return ApiResponse(data=await house_service.like(house_id))
 
+@router.get("/detail", response_model=ApiResponse, tags=["House"])
+async def get_house_details(
+    house_service: Annotated[HouseService, Depends()],
+    ids: List[int] = Query(...)
+):
+    return api_response(await house_service.details(ids))
+
 @router.get("/detail/{house_id}", response_model=ApiResponse, tags=["House"])
 async def patch_house_detail(
     house_id: int,
     house_service: Annotated[HouseService, Depends()]
 ):
-    return ApiResponse(data=await house_service.detail(house_id))
+    return api_response(await house_service.detail(house_id))
+
+@router.get("/recommendation/list", response_model=ApiResponse, tags=["House"])
+async def get_house_recommendation_by_cursor(
+    background_tasks: BackgroundTasks,
+    house_service: Annotated[HouseService, Depends()],
+    cursor: Optional[str] = None,
+    size: int = Query(settings.HOUSE_PAGE_SIZE, ge=1, le=settings.HOUSE_PAGE_SIZE_MAX)
+):
+    return api_response(await house_service.recommendation_list_by_cursor(background_tasks, cursor, size))
 
 @router.get("/recommendation/list/{page}", response_model=ApiResponse, tags=["House"])
 async def get_house_recommendation(
@@ -41,7 +57,16 @@ async def get_house_recommendation(
     background_tasks: BackgroundTasks,
     house_service: Annotated[HouseService, Depends()]
 ):
-    return ApiResponse(data=await house_service.recommendation_list(background_tasks, page))
+    return api_response(await house_service.recommendation_list(background_tasks, page))
+
+@router.get("/list", response_model=ApiResponse, tags=["House"])
+async def get_house_list_by_cursor(
+    background_tasks: BackgroundTasks,
+    house_service: Annotated[HouseService, Depends()],
+    cursor: Optional[str] = None,
+    size: int = Query(settings.HOUSE_PAGE_SIZE, ge=1, le=settings.HOUSE_PAGE_SIZE_MAX)
+):
+    return api_response(await house_service.list_by_cursor(background_tasks, cursor, size))
 
 @router.get("/list/{page}", response_model=ApiResponse, tags=["House"])
 async def get_house_list(
@@ -49,4 +74,4 @@ async def get_house_list(
     background_tasks: BackgroundTasks,
     house_service: Annotated[HouseService, Depends()]
 ):
-    return ApiResponse(data=await house_service.list(background_tasks, page))
+    return api_response(await house_service.list(background_tasks, page))
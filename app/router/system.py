@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.health import readiness
+from app.core.stats import cache_stats
+from app.db.database import redis_pool_stats
+from app.schemas.response import ApiResponse
+from app.service.admission import chat_admission
+
+router = APIRouter()
+
+@router.get("/system/stats", response_model=ApiResponse, tags=["System"])
+async def get_system_stats():
+    return ApiResponse(data={
+        "redis_pool": redis_pool_stats(),
+        "caches": {name: counter.as_dict() for name, counter in cache_stats.items()},
+        "chat_admission": chat_admission.stats(),
+        "readiness": readiness.as_dict(),
+    })
+
+@router.get("/system/live", response_model=ApiResponse, tags=["System"])
+async def get_system_live():
+    return ApiResponse(data={"status": "ok"})
+
+@router.get("/system/ready", response_model=ApiResponse, tags=["System"])
+async def get_system_ready():
+    if not readiness.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="워커가 아직 준비되지 않았습니다."
+        )
+    return ApiResponse(data=readiness.as_dict())
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
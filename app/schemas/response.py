@@ -1,5 +1,7 @@
-from typing import Optional, Any
+from typing import Optional, Any, Union
 
+import orjson
+from fastapi import Response
 from pydantic import BaseModel
 
 class ApiResponse(BaseModel):
@@ -12,4 +14,19 @@ class ApiResponse(BaseModel):
 class JwtToken(BaseModel):
     is_signup: bool
     nickname: str
-    access_token: str
\ No newline at end of file
+    access_token: str
+
+
+class RawJSON:
+    # 캐시에 저장된 JSON을 다시 파싱하지 않고 응답에 그대로 넣기 위한 래퍼입니다.
+    def __init__(self, content: Union[str, bytes]):
+        self.content = content.encode() if isinstance(content, str) else content
+
+
+API_RESPONSE_PREFIX = orjson.dumps(ApiResponse().dict(exclude={"data"}))[:-1] + b',"data":'
+
+
+def api_response(data) -> Union[ApiResponse, Response]:
+    if isinstance(data, RawJSON):
+        return Response(content=API_RESPONSE_PREFIX + data.content + b"}", media_type="application/json")
+    return ApiResponse(data=data)
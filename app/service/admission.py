@@ -0,0 +1,305 @@
+import asyncio
+import math
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import aioredis
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import CHAT_ADMISSION_ACTIVE, CHAT_ADMISSION_WAITING, CHAT_ADMISSION_SHED
+from app.db.database import get_current_user, get_redis_client
+from app.db.memory_redis import register_script
+from app.db.models import User
+from app.schemas.request import Chat
+from app.service.chat import check_format
+
+# /chat 파이프라인 입장 제어입니다. 모든 워커가 같은 Redis 키를 보므로 제한이 서비스 전체에 적용됩니다.
+# - chat:rate:{user_id}: 사용자별 토큰 버킷 (tokens, ts 해시)
+# - chat:slots: 실행 중인 파이프라인 슬롯 (토큰 -> 만료 시각(ms) 해시)
+#   슬롯에 만료 시각이 있어서 워커가 죽어도 자리가 영원히 잡혀 있지 않습니다.
+CHAT_SLOTS_KEY = "chat:slots"
+
+
+def rate_key(user_id: int) -> str:
+    return f"chat:rate:{user_id}"
+
+
+# 워커마다 시계가 다를 수 있어 Redis 서버 시간(TIME)을 기준으로 계산합니다.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+
+@register_script(TOKEN_BUCKET_SCRIPT)
+async def token_bucket_in_memory(redis, keys: list, args: list) -> list:
+    rate, capacity = float(args[0]), float(args[1])
+    now = time.time()
+    bucket = await redis.hgetall(keys[0])
+    tokens = float(bucket.get("tokens", capacity))
+    ts = float(bucket.get("ts", now))
+    tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+    allowed, retry_after = 0, 0.0
+    if tokens >= 1:
+        tokens -= 1
+        allowed = 1
+    else:
+        retry_after = (1 - tokens) / rate
+    await redis.hset(keys[0], mapping={"tokens": tokens, "ts": now})
+    await redis.expire(keys[0], math.ceil(capacity / rate) + 1)
+    return [allowed, str(retry_after)]
+
+
+# KEYS[1] 해시에서 만료된 슬롯을 지우고, 남은 슬롯이 ARGV[2]개 미만이면 ARGV[1] 슬롯을 ARGV[3]ms 동안 잡습니다.
+# 사용자별 /chat 작업 수 제한에도 같은 스크립트를 씁니다.
+ACQUIRE_SLOT_SCRIPT = """
+local limit = tonumber(ARGV[2])
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local slots = redis.call('HGETALL', KEYS[1])
+local active = 0
+for i = 1, #slots, 2 do
+    if tonumber(slots[i + 1]) <= now then
+        redis.call('HDEL', KEYS[1], slots[i])
+    else
+        active = active + 1
+    end
+end
+if active >= limit then
+    return {0, active}
+end
+redis.call('HSET', KEYS[1], ARGV[1], tostring(now + tonumber(ARGV[3])))
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return {1, active + 1}
+"""
+
+
+@register_script(ACQUIRE_SLOT_SCRIPT)
+async def acquire_slot_in_memory(redis, keys: list, args: list) -> list:
+    limit, ttl = int(args[1]), int(args[2])
+    now = int(time.time() * 1000)
+    active = 0
+    for token, expire_at in (await redis.hgetall(keys[0])).items():
+        if int(expire_at) <= now:
+            await redis.hdel(keys[0], token)
+        else:
+            active += 1
+    if active >= limit:
+        return [0, active]
+    await redis.hset(keys[0], args[0], now + ttl)
+    await redis.pexpire(keys[0], ttl)
+    return [1, active + 1]
+
+
+# KEYS[1] 해시에 ARGV[1] 슬롯이 아직 있으면 만료 시각을 지금부터 ARGV[2]ms 뒤로 늦춥니다.
+RENEW_SLOT_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+redis.call('HSET', KEYS[1], ARGV[1], tostring(now + tonumber(ARGV[2])))
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+@register_script(RENEW_SLOT_SCRIPT)
+async def renew_slot_in_memory(redis, keys: list, args: list) -> int:
+    if await redis.hget(keys[0], args[0]) is None:
+        return 0
+    ttl = int(args[1])
+    await redis.hset(keys[0], args[0], int(time.time() * 1000) + ttl)
+    await redis.pexpire(keys[0], ttl)
+    return 1
+
+
+async def renew_slot(redis: aioredis.Redis, key: str, token: str, ttl: float) -> bool:
+    return bool(int(await redis.eval(RENEW_SLOT_SCRIPT, 1, key, token, int(ttl * 1000))))
+
+
+@asynccontextmanager
+async def keep_slot(redis: aioredis.Redis, key: str, token: str, ttl: float):
+    # 슬롯을 잡고 있는 동안 ttl/3마다 만료 시각을 늦춰서, 오래 걸리는 작업 중에 슬롯이 풀리지 않게 합니다.
+    # 워커가 죽으면 갱신도 멈추므로 ttl 뒤에 슬롯이 풀립니다.
+    async def renew():
+        while True:
+            await asyncio.sleep(ttl / 3)
+            try:
+                await renew_slot(redis, key, token, ttl)
+            except Exception as e:
+                print(f"슬롯 갱신 실패 ({key}): {e!r}")
+
+    task = asyncio.create_task(renew())
+    try:
+        yield
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class ChatAdmission:
+    # 사용자별 요청 속도와 서비스 전체 동시 실행 수를 제한합니다.
+    # 자리가 없으면 프로세스마다 queue_size명까지만 wait_timeout 동안 기다리고, 나머지는 바로 429로 돌려보냅니다.
+    def __init__(
+        self,
+        max_concurrency: int,
+        rate: float,
+        burst: int,
+        queue_size: int,
+        wait_timeout: float,
+        job_wait_timeout: float,
+        poll_interval: float,
+        slot_ttl: float,
+        retry_after: int,
+    ):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self.wait_timeout = wait_timeout
+        self.job_wait_timeout = job_wait_timeout
+        self.poll_interval = poll_interval
+        self.slot_ttl = slot_ttl
+        self.retry_after = retry_after
+        self.waiting = 0
+        self.job_waiting = 0
+        self.shed_counts = {}
+
+    @classmethod
+    def from_settings(cls) -> "ChatAdmission":
+        return cls(
+            max_concurrency=settings.CHAT_MAX_CONCURRENCY,
+            rate=settings.CHAT_RATE_LIMIT,
+            burst=settings.CHAT_RATE_BURST,
+            queue_size=settings.CHAT_ADMISSION_QUEUE_SIZE,
+            wait_timeout=settings.CHAT_ADMISSION_TIMEOUT,
+            job_wait_timeout=settings.CHAT_JOB_ADMISSION_TIMEOUT,
+            poll_interval=settings.CHAT_ADMISSION_POLL_INTERVAL,
+            slot_ttl=settings.CHAT_ADMISSION_SLOT_TTL,
+            retry_after=settings.CHAT_ADMISSION_RETRY_AFTER,
+        )
+
+    def shed(self, reason: str, retry_after: int, detail: str, status_code: int = status.HTTP_429_TOO_MANY_REQUESTS) -> HTTPException:
+        self.shed_counts[reason] = self.shed_counts.get(reason, 0) + 1
+        CHAT_ADMISSION_SHED.labels(reason).inc()
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    async def check_rate(self, redis: aioredis.Redis, user_id: int) -> None:
+        if self.rate <= 0:
+            return
+        allowed, retry_after = await redis.eval(TOKEN_BUCKET_SCRIPT, 1, rate_key(user_id), self.rate, self.burst)
+        if not int(allowed):
+            raise self.shed("rate_limit", math.ceil(float(retry_after)), "추천 요청이 너무 잦습니다. 잠시 후 다시 시도해주세요.")
+
+    async def try_acquire(self, redis: aioredis.Redis, token: str) -> bool:
+        acquired, active = await redis.eval(
+            ACQUIRE_SLOT_SCRIPT, 1, CHAT_SLOTS_KEY, token, self.max_concurrency, int(self.slot_ttl * 1000)
+        )
+        CHAT_ADMISSION_ACTIVE.set(int(active))
+        return bool(int(acquired))
+
+    async def acquire(self, redis: aioredis.Redis, shed: bool = True) -> str:
+        token = uuid.uuid4().hex
+        if await self.try_acquire(redis, token):
+            return token
+
+        if not shed:
+            # 이미 접수한 /chat 작업은 바로 버리지 않고 job_wait_timeout 동안 자리가 나기를 기다립니다.
+            # 기다리는 작업 수는 작업 워커 수(CHAT_JOB_WORKERS)로 따로 제한되므로 queue_size에 넣지 않습니다.
+            # 그래도 자리가 없으면 503으로 작업을 실패시켜 클라이언트가 다시 요청하게 합니다.
+            self.job_waiting += 1
+            try:
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.job_wait_timeout
+                while loop.time() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    if await self.try_acquire(redis, token):
+                        return token
+            finally:
+                self.job_waiting -= 1
+            raise self.shed(
+                "job_timeout", self.retry_after, "추천 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+                status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        if self.waiting >= self.queue_size:
+            raise self.shed("queue_full", self.retry_after, "추천 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+
+        self.waiting += 1
+        CHAT_ADMISSION_WAITING.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.wait_timeout
+            while loop.time() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                if await self.try_acquire(redis, token):
+                    return token
+        finally:
+            self.waiting -= 1
+            CHAT_ADMISSION_WAITING.dec()
+        raise self.shed("timeout", self.retry_after, "추천 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+
+    async def release(self, redis: aioredis.Redis, token: str) -> None:
+        await redis.hdel(CHAT_SLOTS_KEY, token)
+
+    @asynccontextmanager
+    async def slot(self, redis: aioredis.Redis, shed: bool = True):
+        if self.max_concurrency <= 0:
+            yield
+            return
+        token = await self.acquire(redis, shed)
+        try:
+            # 파이프라인이 slot_ttl보다 오래 걸려도 슬롯이 만료되어 동시 실행 수를 넘지 않게 합니다.
+            async with keep_slot(redis, CHAT_SLOTS_KEY, token, self.slot_ttl):
+                yield
+        finally:
+            await self.release(redis, token)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "job_waiting": self.job_waiting,
+            "queue_size": self.queue_size,
+            "shed": dict(self.shed_counts),
+        }
+
+
+chat_admission = ChatAdmission.from_settings()
+
+
+async def admit_chat(
+    chat_data: Chat,
+    user: User = Depends(get_current_user),
+    redis: aioredis.Redis = Depends(get_redis_client)
+):
+    # 잘못된 요청은 토큰이나 슬롯을 쓰기 전에 400으로 돌려보냅니다.
+    # /chat/sync 요청이 끝날 때까지 슬롯을 잡고 있습니다.
+    await check_format(chat_data)
+    await chat_admission.check_rate(redis, user.id)
+    async with chat_admission.slot(redis):
+        yield
@@ -1,22 +1,54 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import aioredis
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db, save_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db, save_db, get_redis_client, invalidate_user_cache
 from app.db.models import User
 import jwt
 import datetime
 from passlib.context import CryptContext
 
+from app.core.config import settings
 from app.schemas.request import Auth
 from app.schemas.response import JwtToken
 
 secret_key = 'sarabwayu'
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# BCRYPT_ROUNDS가 바뀌면 다른 cost로 저장된 해시는 로그인할 때 새 cost로 다시 해싱됩니다.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt는 CPU를 오래 쓰므로 이벤트 루프가 아닌 제한된 스레드 풀에서 실행합니다.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.BCRYPT_WORKERS or os.cpu_count(),
+    thread_name_prefix="bcrypt",
+)
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> tuple:
+    # (비밀번호 일치 여부, 다시 해싱한 값 또는 None)
+    return await asyncio.get_running_loop().run_in_executor(
+        password_executor, pwd_context.verify_and_update, password, hashed_password
+    )
 
 
 class AuthService:
 
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(self, db: AsyncSession = Depends(get_db), redis: aioredis.Redis = Depends(get_redis_client)):
         self.db = db
+        self.redis = redis
 
     async def create_token(self, nickname: str):
         # 페이로드 설정
@@ -31,27 +63,31 @@ class AuthService:
     async def login(self, auth_data: Auth):
         # 회원가입이 돼 있으면 토큰 반환
 
-        hahsed_password = pwd_context.hash(auth_data.password)
-        user = self.db.query(User).filter(
+        user = await self.db.scalar(select(User).filter(
             User.nickname == auth_data.nickname,
-        ).first()
+        ))
 
         if user:
-            if not pwd_context.verify(auth_data.password, user.hashed_password):
+            is_valid, new_hashed_password = await verify_password(auth_data.password, user.hashed_password)
+            if not is_valid:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="이미 사용중인 닉네임이거나 비밀번호가 틀렸습니다.",
                 )
+            if new_hashed_password:
+                user.hashed_password = new_hashed_password
+                await save_db(user, self.db)
+                await invalidate_user_cache(self.redis, user.nickname)
             token = await self.create_token(auth_data.nickname)
             is_signup = False
 
         # 회원가입이 안 돼 있으면 db에 저장하고 토큰 반환
         else:
             user = User(
-                hashed_password=hahsed_password,
+                hashed_password=await hash_password(auth_data.password),
                 nickname=auth_data.nickname
             )
-            save_db(user, self.db)
+            await save_db(user, self.db)
             token = await self.create_token(auth_data.nickname)
             is_signup = True
 
@@ -1,52 +1,68 @@
-import json
-
 import aioredis
-import requests
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
-from app.db.database import get_db, get_current_user, save_db, get_redis_client
+from app.core.metrics import stage_timer
+from app.db.database import get_db, get_current_user, bulk_insert_db, get_redis_client
 from app.db.models import User, House, Recommendation
 from app.schemas.request import Chat
-from app.service.house import HouseRecommender
+from app.service.house import bump_list_generation
+from app.service.recommender import get_house_index, recommend_executor, PERSON_COUNTS, PERIODS, IDENTITIES, CARS, CHILDREN
+from app.service.reranker import RerankerClient, get_reranker_client
+
+
+async def check_format(data: Chat) -> Chat:
+    if data.person_count not in PERSON_COUNTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="person_count가 잘못되었습니다."
+        )
+    if data.period not in PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="period가 잘못되었습니다."
+        )
+    if data.identity not in IDENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="identity가 잘못되었습니다."
+        )
+    if data.car not in CARS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="car가 잘못되었습니다."
+        )
+    if data.child not in CHILDREN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="child가 잘못되었습니다."
+        )
+    return data
 
 
 class ChatService:
-    def __init__(self, db: Session = Depends(get_db), user: User = Depends(get_current_user), redis: aioredis.Redis = Depends(get_redis_client)):
+    def __init__(self, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user), redis: aioredis.Redis = Depends(get_redis_client), reranker: RerankerClient = Depends(get_reranker_client)):
         self.db = db
         self.user = user
         self.redis = redis
+        self.reranker = reranker
 
-    async def chat(self, chat_data: Chat):
+    async def fetch_candidate_house_ids(self) -> list:
+        # 도보 10분 이내, 주차 가능한 집 중 이미 추천된 집을 NOT EXISTS로 제외하고 id만 가져옵니다.
+        already_recommended = select(Recommendation.id).filter(
+            Recommendation.user_id == self.user.id,
+            Recommendation.house_id == House.id,
+            Recommendation.is_deleted == False
+        ).exists()
+        return list(await self.db.scalars(select(House.id).filter(
+            House.is_deleted == False,
+            House.walkTime <= 10,
+            House.aptParkingCountPerHousehold > 0,
+            ~already_recommended
+        )))
 
-        async def check_format(data):
-            if data.person_count not in ["1명", "2명", "3명", "4명 이상"]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="person_count가 잘못되었습니다."
-                )
-            if data.period not in ["1주", "2주", "3주", "4주 이상"]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="period가 잘못되었습니다."
-                )
-            if data.identity not in ["학생", "직장인", "기타"]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="identity가 잘못되었습니다."
-                )
-            if data.car not in ["자차", "대중교통"]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="car가 잘못되었습니다."
-                )
-            if data.child not in ["아이 있음", "아이 없음"]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="child가 잘못되었습니다."
-                )
-            return data
+    async def chat(self, chat_data: Chat):
 
         chat_data = await check_format(chat_data)
 
@@ -59,21 +75,22 @@ class ChatService:
             "significant": chat_data.significant
         }
 
-        # 모든 집 데이터 가져오기
-        all_houses = self.db.query(House).filter(House.is_deleted == False).all()
+        # 미리 만들어 둔 집 인덱스 가져오기
+        with stage_timer("house_load"):
+            house_index = await get_house_index(self.db)
+        if house_index is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="추천할 집 데이터가 없습니다."
+            )
 
-        # 이미 추천된 데이터 제거
-        recommended_houses = self.db.query(Recommendation).filter(
-            Recommendation.user_id == self.user.id,
-            Recommendation.is_deleted == False
-        ).all()
-        for house in all_houses:
-            if house.id in [recommended_house.house_id for recommended_house in recommended_houses]:
-                all_houses.remove(house)
+        # 조건에 맞고 아직 추천되지 않은 집만 db에서 고릅니다.
+        with stage_timer("candidate_filter"):
+            candidate_ids = await self.fetch_candidate_house_ids()
 
         # 추천 알고리즘 실행
-        house_recommender = HouseRecommender([house.__dict__ for house in all_houses])
-        recommended_houses = house_recommender.recommend(persona)
+        with stage_timer("score"):
+            recommended_houses = await recommend_executor.recommend(house_index, persona, candidate_ids)
 
         # 추천된 데이터 이름 - id 매핑
         recommended_map = {}
@@ -94,41 +111,21 @@ class ChatService:
             house_dict['aptParkingCountPerHousehold'] = house['aptParkingCountPerHousehold']
             candidates.append(house_dict)
 
-        request_data = {
-            "user_info": json.dumps(persona, ensure_ascii=False),
-            "candidates": json.dumps(candidates, ensure_ascii=False)
-        }
+        with stage_timer("llm"):
+            rank_data, return_data = await self.reranker.cached_rank(self.redis, persona, candidates)
 
-        retry_count = 3
-
-        while retry_count > 0:
-            try:
-                response = requests.post(settings.HOUSE_REC_URL, json=request_data)
-                rank_section = response.text.split("rank:")[1]
-                reason_section = rank_section.split("reason:")[1]
-                rank_data = rank_section.split("reason:")[0]
-                rank_data = rank_data[rank_data.find("["):rank_data.find("]") + 1]
-                reason_section = reason_section[reason_section.find("["):reason_section.find("]") + 1]
-                rank_data = json.loads(rank_data.replace('\\"', '"'))
-                return_data = json.loads(reason_section.replace('\\"', '"'))
-                break
-            except:
-                retry_count -= 1
-                print(f"API 호출 시도 중... {retry_count}회 남음")
-                if retry_count == 0:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"{rank_data}, {reason_section}"
-                    )
-
-        for rank in rank_data:
-            recommendation = Recommendation(
-                user_id=self.user.id,
-                house_id=recommended_map[rank],
-                reason=return_data[rank_data.index(rank)]
-            )
-            save_db(recommendation, self.db)
+        # 후보에 없는 이름은 저장하지 않고 건너뜁니다.
+        ranked = [(rank, reason) for rank, reason in zip(rank_data, return_data) if rank in recommended_map]
+        rank_data = [rank for rank, _ in ranked]
+        return_data = [reason for _, reason in ranked]
+
+        # 순위 전체를 한 번에 저장해서 일부만 저장되는 일이 없게 합니다.
+        with stage_timer("persist"):
+            await bulk_insert_db(Recommendation, [
+                {"user_id": self.user.id, "house_id": recommended_map[rank], "reason": reason}
+                for rank, reason in ranked
+            ], self.db)
 
-        await self.redis.delete(f"list:{self.user.id}:*")
+            await bump_list_generation(self.redis, self.user.id)
 
         return {"rank": rank_data, "reason": return_data}
\ No newline at end of file
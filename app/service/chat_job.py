@@ -0,0 +1,199 @@
+import asyncio
+import json
+import uuid
+from typing import Optional
+
+import aioredis
+from fastapi import Depends, HTTPException, status
+
+from app.core.config import settings
+from app.db.database import get_current_user, get_redis_client, get_SessionLocal, create_redis_client
+from app.db.models import User
+from app.schemas.request import Chat
+from app.service.admission import chat_admission, keep_slot, renew_slot, ACQUIRE_SLOT_SCRIPT
+from app.service.chat import ChatService, check_format
+from app.service.reranker import reranker_client
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def job_key(job_id: str) -> str:
+    return f"chat:job:{job_id}"
+
+
+def user_jobs_key(user_id: int) -> str:
+    # 진행 중인 작업 id -> 만료 시각(ms) 해시입니다.
+    # 워커가 죽어 정리되지 못한 작업도 CHAT_JOB_ACTIVE_TTL이 지나면 제한에서 빠집니다.
+    return f"chat:active_jobs:{user_id}"
+
+
+async def save_job(redis: aioredis.Redis, job_id: str, job: dict) -> None:
+    await redis.set(job_key(job_id), json.dumps(job, ensure_ascii=False), ex=settings.CHAT_JOB_TTL)
+
+
+class ChatJobWorker:
+    # /chat 추천 파이프라인을 실행하는 프로세스 내 작업자 풀입니다.
+    # 큐 크기와 작업자 수가 정해져 있어 동시에 실행되는 파이프라인 수가 제한됩니다.
+    def __init__(self, worker_count: int, queue_size: int):
+        self.worker_count = worker_count
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks = []
+        self.redis: Optional[aioredis.Redis] = None
+        # 실행 중인 작업 id -> user_id (종료할 때 실패로 정리합니다)
+        self.running = {}
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.redis = create_redis_client()
+        self.tasks = [asyncio.create_task(self.work()) for _ in range(self.worker_count)]
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        # 끝나지 못한 작업과 큐에 남은 작업은 실패로 기록해서 사용자가 다시 요청할 수 있게 합니다.
+        unfinished = dict(self.running)
+        while self.queue is not None and not self.queue.empty():
+            job_id, user_id, _ = self.queue.get_nowait()
+            unfinished[job_id] = user_id
+        for job_id, user_id in unfinished.items():
+            await self.finish(job_id, {
+                "status": JOB_FAILED, "user_id": user_id, "status_code": 503,
+                "error": "서버가 재시작되어 추천 작업이 취소되었습니다."
+            })
+        self.running = {}
+
+    def submit(self, job_id: str, user_id: int, chat_data: Chat) -> None:
+        if self.queue is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="추천 작업자가 준비되지 않았습니다."
+            )
+        try:
+            self.queue.put_nowait((job_id, user_id, chat_data))
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="추천 요청이 많습니다. 잠시 후 다시 시도해주세요."
+            )
+
+    async def work(self) -> None:
+        while True:
+            job_id, user_id, chat_data = await self.queue.get()
+            try:
+                await self.run(job_id, user_id, chat_data)
+            finally:
+                self.queue.task_done()
+
+    async def finish(self, job_id: str, job: dict) -> None:
+        await save_job(self.redis, job_id, job)
+        await self.redis.hdel(user_jobs_key(job["user_id"]), job_id)
+
+    async def run(self, job_id: str, user_id: int, chat_data: Chat) -> None:
+        self.running[job_id] = user_id
+        jobs_key = user_jobs_key(user_id)
+        # 큐에서 기다리는 사이 사용자 작업 자리가 만료되었으면 이미 제한에서 빠진 작업이므로 실행하지 않습니다.
+        if await renew_slot(self.redis, jobs_key, job_id, settings.CHAT_JOB_ACTIVE_TTL):
+            # 실행하는 동안 자리의 만료 시각을 늦춰서 사용자가 CHAT_JOB_MAX_PER_USER를 넘지 않게 합니다.
+            async with keep_slot(self.redis, jobs_key, job_id, settings.CHAT_JOB_ACTIVE_TTL):
+                job = await self.execute(job_id, user_id, chat_data)
+        else:
+            job = {
+                "status": JOB_FAILED, "user_id": user_id, "status_code": 503,
+                "error": "추천 작업 대기 시간이 지나 취소되었습니다. 다시 시도해주세요."
+            }
+
+        await self.finish(job_id, job)
+        self.running.pop(job_id, None)
+
+    async def execute(self, job_id: str, user_id: int, chat_data: Chat) -> dict:
+        await save_job(self.redis, job_id, {"status": JOB_RUNNING, "user_id": user_id})
+
+        async with get_SessionLocal()() as db:
+            try:
+                user = await db.get(User, user_id)
+                # 접수할 때 속도 제한을 통과한 작업이므로 CHAT_JOB_ADMISSION_TIMEOUT까지 자리가 나기를 기다립니다.
+                async with chat_admission.slot(self.redis, shed=False):
+                    result = await ChatService(db, user, self.redis, reranker_client).chat(chat_data)
+                return {"status": JOB_DONE, "user_id": user_id, "result": result}
+            except HTTPException as e:
+                return {"status": JOB_FAILED, "user_id": user_id, "status_code": e.status_code, "error": e.detail}
+            except Exception as e:
+                print(f"추천 작업 {job_id} 실패: {e!r}")
+                return {"status": JOB_FAILED, "user_id": user_id, "status_code": 500, "error": "추천 중 오류가 발생했습니다."}
+
+
+chat_job_worker = ChatJobWorker(settings.CHAT_JOB_WORKERS, settings.CHAT_JOB_QUEUE_SIZE)
+
+
+class ChatJobService:
+    def __init__(self, user: User = Depends(get_current_user), redis: aioredis.Redis = Depends(get_redis_client)):
+        self.user = user
+        self.redis = redis
+
+    async def submit(self, chat_data: Chat) -> dict:
+        chat_data = await check_format(chat_data)
+        await chat_admission.check_rate(self.redis, self.user.id)
+
+        # 사용자별 동시 작업 수를 제한합니다. 거절된 요청은 키를 건드리지 않습니다.
+        job_id = uuid.uuid4().hex
+        jobs_key = user_jobs_key(self.user.id)
+        accepted, _ = await self.redis.eval(
+            ACQUIRE_SLOT_SCRIPT, 1, jobs_key, job_id, settings.CHAT_JOB_MAX_PER_USER, int(settings.CHAT_JOB_ACTIVE_TTL * 1000)
+        )
+        if not int(accepted):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="이미 진행 중인 추천 요청이 있습니다."
+            )
+
+        await save_job(self.redis, job_id, {"status": JOB_QUEUED, "user_id": self.user.id})
+        try:
+            chat_job_worker.submit(job_id, self.user.id, chat_data)
+        except HTTPException:
+            await self.redis.hdel(jobs_key, job_id)
+            await self.redis.delete(job_key(job_id))
+            raise
+
+        return {"job_id": job_id, "status": JOB_QUEUED}
+
+    async def get(self, job_id: str) -> dict:
+        job = await self.redis.get(job_key(job_id))
+        job = json.loads(job) if job else None
+        if not job or job["user_id"] != self.user.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="추천 작업을 찾을 수 없습니다."
+            )
+        job.pop("user_id")
+        job["job_id"] = job_id
+        return job
+
+    async def events(self, job_id: str):
+        # 작업 상태가 바뀔 때마다 SSE 이벤트를 보내고, 끝나면 스트림을 닫습니다.
+        job = await self.get(job_id)
+
+        async def stream():
+            last_status = None
+            current = job
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.CHAT_JOB_TTL
+            while True:
+                if current["status"] != last_status:
+                    last_status = current["status"]
+                    yield f"event: {last_status}\ndata: {json.dumps(current, ensure_ascii=False)}\n\n"
+                if last_status in (JOB_DONE, JOB_FAILED) or loop.time() > deadline:
+                    break
+                await asyncio.sleep(settings.CHAT_JOB_POLL_INTERVAL)
+                try:
+                    current = await self.get(job_id)
+                except HTTPException:
+                    break
+
+        return stream()
@@ -1,235 +1,229 @@
+import base64
 import json
+from datetime import datetime
+from typing import Optional
+
 import aioredis
-from fastapi import Depends, BackgroundTasks
+import orjson
+from fastapi import Depends, BackgroundTasks, HTTPException, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
-import numpy as np
-from app.db.database import get_db, get_current_user, save_db, get_redis_client
-from app.db.models import User, House, Recommendation, LikedHouse
-
-
-class HouseRecommender:
-    def __init__(self, house_info):
-        self.house_info = house_info
-        self.tfidf_vectorizer = TfidfVectorizer()
-
-        # 모든 텍스트 데이터를 수집하여 TF-IDF 벡터화기를 학습시킵니다.
-        all_texts = [
-            ' '.join(house['tagList']) + ' ' +
-            house['articleFeatureDescription'] +
-            (" " + house['detailDescription'] if house['detailDescription'] != "없음" else "")
-            for house in self.house_info
-        ]
-
-        self.tfidf_vectorizer.fit(all_texts)  # 여기서 fit을 호출합니다.
-
-    def vectorize_categorical_data(self, persona):
-        person_count = int(persona['person_count'].replace('명', '').split()[0])
-
-        if '한달' in persona['period'] or '이상' in persona['period']:
-            period = 4
-        else:
-            period = int(persona['period'].replace('주', ''))
-
-        identity_vector = [1 if identity in persona['identity'] else 0 for identity in
-                           ['학생', '직장인', '취준생', '기타']]
-        car = 1 if persona['car'] == '차 있음' else 0
-        child = 1 if persona['child'] == '아이 있음' else 0
-
-        return np.array([person_count, period] + identity_vector + [car, child])
-
-    def vectorize_text_data(self, text):
-        return self.tfidf_vectorizer.transform([text]).toarray().flatten()
-
-    def extract_room_count(self, house):
-        room_tags = [tag for tag in house['tagList'] if '방' in tag]
-        room_count_map = {"한개": 1, "두개": 2, "세개": 3, "네개": 4, "다섯개": 5}
-
-        if room_tags:
-            for key, value in room_count_map.items():
-                if key in room_tags[0]:
-                    return value
-        return 1
-
-    def vectorize_data(self, house, persona):
-        persona_vector = self.vectorize_categorical_data(persona)
-        house_text = house['articleFeatureDescription'] + ' ' + ' '.join(house['tagList']) + (
-            " " + house['detailDescription'] if house['detailDescription'] != "없음" else "")
-        house_text_vector = self.vectorize_text_data(house_text)
-        persona_text_vector = self.vectorize_text_data(persona['significant'])
-
-        # 방 개수와 인원 수의 차이 계산
-        room_count = self.extract_room_count(house)
-        person_count = int(persona['person_count'].replace('명', '').split()[0])
-        room_person_diff = room_count - person_count
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.stats import get_cache_stats
+from app.db.database import get_db, get_current_user, save_db, upsert_db, get_redis_client
+from app.db.models import User, House, Recommendation
+from app.schemas.response import RawJSON
+from app.service.like import get_like_states, toggle_like
+from app.service.recommender import refresh_house_index, add_to_house_index, bump_catalog_revision
+
+list_cache_stats = get_cache_stats("list")
+catalog_cache_stats = get_cache_stats("catalog_page")
+detail_cache_stats = get_cache_stats("house_detail")
+
+
+HOUSE_ROW_TYPES = {
+    "aptName": str,
+    "tradeBuildingTypeCode": str,
+    "aptHeatMethodTypeName": str,
+    "aptHeatFuelTypeName": str,
+    "aptParkingCountPerHousehold": float,
+    "aptHouseholdCount": int,
+    "exposureAddress": str,
+    "monthlyManagementCost": int,
+    "articleFeatureDescription": str,
+    "detailDescription": str,
+    "floorLayerName": str,
+    "principalUse": str,
+    "tagList": list,
+    "schoolName": str,
+    "organizationType": str,
+    "establishmentYmd": str,
+    "walkTime": int,
+    "studentCountPerTeacher": float,
+    "url": str,
+}
+
+
+def to_house_row(house_data: dict) -> dict:
+    # 원본 데이터를 House 컬럼 타입에 맞게 변환합니다.
+    row = {column: column_type(house_data[column]) for column, column_type in HOUSE_ROW_TYPES.items()}
+    row["image_url"] = house_data.get("image_url")
+    row["establishmentYmd"] = datetime.strptime(row["establishmentYmd"], "%Y%m%d").date()
+    return row
+
+
+def read_house_rows(path: str, stats: dict):
+    # 파일 전체를 읽지 않고 한 줄씩 House 행으로 변환합니다.
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            stats["read"] += 1
+
+            try:
+                house_data = json.loads(line)
+                if house_data['url'] == "없음" or house_data['image_url'] == "이미지 없음":
+                    stats["skipped"] += 1
+                    continue
+                # url은 같은 단지의 여러 매물이 공유하므로, 원본의 id를 매물 식별자로 씁니다.
+                row = to_house_row(house_data)
+                row["source_id"] = int(house_data["id"])
+                yield row
+            except (KeyError, TypeError, ValueError):
+                stats["invalid"] += 1
+
+
+def encode_cursor(last_id: Optional[int]) -> Optional[str]:
+    if last_id is None:
+        return None
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor가 잘못되었습니다."
+        )
 
-        # 벡터 길이 일치화
-        max_length = max(len(house_text_vector), len(persona_text_vector))
-        house_text_vector = np.pad(house_text_vector, (0, max_length - len(house_text_vector)), 'constant')
-        persona_text_vector = np.pad(persona_text_vector, (0, max_length - len(persona_text_vector)),
-                                     'constant')
 
-        # 벡터 결합
-        house_vector = np.concatenate([persona_vector, house_text_vector, [room_person_diff]])
-        persona_vector = np.concatenate([persona_vector, persona_text_vector, [0]])  # 여기서 [0] 대신 다른 값이 들어갈 수 있음
+def list_generation_key(user_id: int) -> str:
+    return f"list:{user_id}:gen"
 
-        return house_vector, persona_vector
 
-    def recommend(self, persona, top_n=3):
-        house_list = []
-        selected_apt_names = set()  # 선택된 매물의 이름을 추적하는 집합
+async def bump_list_generation(redis: aioredis.Redis, user_id: int) -> None:
+    # 사용자의 목록 캐시 세대를 올립니다. 이전 세대의 캐시는 TTL이 지나면 사라집니다.
+    await redis.incr(list_generation_key(user_id))
 
-        # 필터링된 매물 정보 사용
-        filtered_house_info = [house for house in self.house_info if
-                               int(house['walkTime']) <= 10 and float(house['aptParkingCountPerHousehold']) > 0]
 
-        for house in filtered_house_info:
-            if house['aptName'] not in selected_apt_names:  # 매물 이름이 아직 선택되지 않았다면
-                house_vector, persona_vector = self.vectorize_data(house, persona)
-                similarity = cosine_similarity([house_vector], [persona_vector])
-                house_list.append((similarity[0][0], house))
-                selected_apt_names.add(house['aptName'])  # 매물 이름을 선택된 목록에 추가
+# 집 목록은 모든 사용자에게 같으므로 좋아요 여부를 뺀 페이지를 전체가 공유하고,
+# 집이 추가될 때마다 카탈로그 버전을 올려 이전 버전의 페이지를 버립니다.
+CATALOG_VERSION_KEY = "catalog:version"
 
-        house_list.sort(key=lambda x: x[0], reverse=True)
 
-        return house_list[:top_n]
+async def bump_catalog_version(redis: aioredis.Redis) -> None:
+    await redis.incr(CATALOG_VERSION_KEY)
 
 
 class HouseService:
-    def __init__(self, db: Session = Depends(get_db), user: User = Depends(get_current_user), redis: aioredis.Redis = Depends(get_redis_client)):
+    def __init__(self, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user), redis: aioredis.Redis = Depends(get_redis_client)):
         self.db = db
         self.user = user
         self.redis = redis
 
-    async def initailize(self) -> None:
-        with open('app/service/apartment_info.jsonl', 'r') as f:
-            data = f.readlines()
-            for line in data:
-                house_data = json.loads(line)
-                if house_data['url'] == "없음" or house_data['image_url'] == "이미지 없음":
-                    continue
-                house_info = House(
-                    aptName=house_data['aptName'],
-                    tradeBuildingTypeCode=house_data['tradeBuildingTypeCode'],
-                    aptHeatMethodTypeName=house_data['aptHeatMethodTypeName'],
-                    aptHeatFuelTypeName=house_data['aptHeatFuelTypeName'],
-                    aptParkingCountPerHousehold=house_data['aptParkingCountPerHousehold'],
-                    aptHouseholdCount=house_data['aptHouseholdCount'],
-                    exposureAddress=house_data['exposureAddress'],
-                    monthlyManagementCost=house_data['monthlyManagementCost'],
-                    articleFeatureDescription=house_data['articleFeatureDescription'],
-                    detailDescription=house_data['detailDescription'],
-                    floorLayerName=house_data['floorLayerName'],
-                    principalUse=house_data['principalUse'],
-                    tagList=house_data['tagList'],
-                    schoolName=house_data['schoolName'],
-                    organizationType=house_data['organizationType'],
-                    establishmentYmd=house_data['establishmentYmd'],
-                    walkTime=house_data['walkTime'],
-                    studentCountPerTeacher=house_data['studentCountPerTeacher'],
-                    url=house_data['url'],
-                    image_url=house_data['image_url']
-                )
-                save_db(house_info, self.db)
-
-
-    async def create(self, house_data: dict) -> House:
-        house = House(
-            aptName=house_data['aptName'],
-            tradeBuildingTypeCode=house_data['tradeBuildingTypeCode'],
-            aptHeatMethodTypeName=house_data['aptHeatMethodTypeName'],
-            aptHeatFuelTypeName=house_data['aptHeatFuelTypeName'],
-            aptParkingCountPerHousehold=house_data['aptParkingCountPerHousehold'],
-            aptHouseholdCount=house_data['aptHouseholdCount'],
-            exposureAddress=house_data['exposureAddress'],
-            monthlyManagementCost=house_data['monthlyManagementCost'],
-            articleFeatureDescription=house_data['articleFeatureDescription'],
-            detailDescription=house_data['detailDescription'],
-            floorLayerName=house_data['floorLayerName'],
-            principalUse=house_data['principalUse'],
-            tagList=house_data['tagList'],
-            schoolName=house_data['schoolName'],
-            organizationType=house_data['organizationType'],
-            establishmentYmd=house_data['establishmentYmd'],
-            walkTime=house_data['walkTime'],
-            studentCountPerTeacher=house_data['studentCountPerTeacher'],
-            url=house_data['url']
+    async def ingest_batch(self, rows: dict, stats: dict) -> None:
+        # 원본 id(source_id)가 같은 매물은 내용을 갱신하고, 없으면 새로 넣습니다.
+        # 내용이 바뀐 매물이 있으면 같은 커밋에서 카탈로그 번호를 올립니다.
+        stats["changed"] += await upsert_db(
+            House, list(rows.values()), "source_id", self.db, on_change=bump_catalog_revision
         )
-        save_db(house, self.db)
+
+    async def initailize(self) -> dict:
+        stats = {"read": 0, "skipped": 0, "invalid": 0, "duplicated": 0, "changed": 0}
+        batch = {}
+
+        for row in read_house_rows(settings.HOUSE_DATA_PATH, stats):
+            if row["source_id"] in batch:
+                stats["duplicated"] += 1
+                continue
+            batch[row["source_id"]] = row
+
+            if len(batch) >= settings.HOUSE_INGEST_BATCH_SIZE:
+                await self.ingest_batch(batch, stats)
+                batch = {}
+                print(f"집 데이터 {stats['read']}건 처리 중... {stats}")
+
+        if batch:
+            await self.ingest_batch(batch, stats)
+        print(f"집 데이터 초기화 완료: {stats}")
+
+        # 카탈로그가 바뀌었으므로 추천 인덱스를 다시 만듭니다.
+        if stats["changed"]:
+            await refresh_house_index(self.db)
+            await bump_catalog_version(self.redis)
+
+        return stats
+
+    async def create(self, house_data: dict) -> dict:
+        try:
+            house = House(**to_house_row(house_data))
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"집 데이터가 잘못되었습니다: {e!r}"
+            )
+        await bump_catalog_revision(self.db)
+        await save_db(house, self.db)
+        await add_to_house_index(self.db, house)
+        await bump_catalog_version(self.redis)
 
         return house_data
 
     async def like(self, house_id: int) -> None:
-
-        status = False
-
-        # db에서 좋아요를 누른 이력이 있는지 확인합니다.
-        like = self.db.query(LikedHouse).filter(
-            LikedHouse.user_id == self.user.id,
-            LikedHouse.house_id == house_id
-        ).first()
-
-        # 이미 좋아요를 누른 이력이 있다면 is_deleted를 True로 변경합니다.
-        if like and like.is_deleted == False:
-            like.is_deleted = True
-            save_db(like, self.db)
-            status = False
-
-        elif like and like.is_deleted == True:
-            like.is_deleted = False
-            save_db(like, self.db)
-            status = True
-
-        # 좋아요를 누른 이력이 없다면 새로운 데이터를 생성합니다.
-        else:
-            liked_house = LikedHouse(
-                user_id=self.user.id,
-                house_id=house_id
+        # 없는 집이나 삭제된 집의 좋아요는 db에 저장할 수 없으므로 받지 않습니다.
+        house = await self.db.scalar(select(House.id).filter(
+            House.id == house_id,
+            House.is_deleted == False
+        ))
+        if house is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="집을 찾을 수 없습니다."
             )
-            save_db(liked_house, self.db)
-            status = True
 
-        await self.redis.delete(f"list:{self.user.id}:*")
+        # Redis의 좋아요 집합에서 바로 토글하고, db에는 LikeFlusher가 나중에 저장합니다.
+        is_like = await toggle_like(self.redis, self.db, self.user.id, house_id)
 
-        return {"is_like": status}
+        # 목록 캐시 세대를 올리고, 이 집의 상세 캐시를 지웁니다.
+        await bump_list_generation(self.redis, self.user.id)
+        await self.redis.delete(self.detail_cache_key(house_id))
 
-    async def detail(self, house_id: int) -> dict:
+        return {"is_like": is_like}
 
-        house = await self.redis.get(f"house:{self.user.id}:{house_id}")
-        if house:
-            return json.loads(house)
+    def detail_cache_key(self, house_id: int) -> str:
+        return f"house:{self.user.id}:{house_id}"
 
-        house = self.db.query(House).filter(
-            House.id == house_id,
+    async def fetch_house_details(self, house_ids: list) -> dict:
+        # House에 사용자의 Recommendation을 left join해서 한 번에 가져오고,
+        # 좋아요 여부는 Redis의 좋아요 집합에서 채웁니다. (취소된 좋아요는 집합에 없습니다.)
+        rows = (await self.db.execute(select(
+            House.id,
+            House.aptName,
+            House.exposureAddress,
+            Recommendation.reason,
+            House.tagList,
+            House.aptHeatMethodTypeName,
+            House.aptHeatFuelTypeName,
+            House.aptHouseholdCount,
+            House.schoolName,
+            House.organizationType,
+            House.walkTime,
+            House.studentCountPerTeacher,
+            House.image_url,
+            House.url,
+        ).outerjoin(
+            Recommendation,
+            (Recommendation.house_id == House.id) & (Recommendation.user_id == self.user.id)
+        ).filter(
+            House.id.in_(house_ids),
             House.is_deleted == False
-        ).first()
-
-        reason = self.db.query(Recommendation.reason).filter(
-            Recommendation.user_id == self.user.id,
-            Recommendation.house_id == house_id
-        ).first()
-
-        if not house:
-            return None
+        ))).all()
 
-        # 좋아요 한 기록이 있는지 확인
+        # 추천 기록이 여러 개면 행이 늘어나므로 집마다 첫 행만 사용합니다.
+        houses = {}
+        for row in rows:
+            houses.setdefault(row.id, row)
 
-        liked_house = self.db.query(LikedHouse).filter(
-            LikedHouse.user_id == self.user.id,
-            LikedHouse.house_id == house_id
-        ).first()
-
-        is_like = False
-        if liked_house:
-            is_like = True
-
-        house = {
+        like_states = await get_like_states(self.redis, self.db, self.user.id, list(houses))
+        return {house.id: {
             "id": house.id,
             "aptName": house.aptName,
             "exposureAddress": house.exposureAddress,
-            "reason": reason.reason if reason else None,
+            "reason": house.reason,
             "tagList": house.tagList,
             "aptHeatMethodTypeName": house.aptHeatMethodTypeName,
             "aptHeatFuelTypeName": house.aptHeatFuelTypeName,
@@ -241,14 +235,46 @@ class HouseService:
             "is_like": is_like,
             "image_url": house.image_url,
             "url": house.url
-        }
-
-        await self.redis.set(f"house:{self.user.id}:{house_id}", json.dumps(house, ensure_ascii=False) , ex=3600)
-
-        return house
-
-    async def fetch_rec_houses_data(self, page) -> list:
+        } for house, is_like in zip(houses.values(), like_states)}
+
+    async def detail_parts(self, house_ids: list) -> list:
+        # 캐시는 MGET 한 번으로 읽고, 없는 집만 db에서 가져와 파이프라인으로 다시 캐싱합니다.
+        cached = await self.redis.mget([self.detail_cache_key(house_id) for house_id in house_ids])
+        parts = dict(zip(house_ids, cached))
+        missing_ids = [house_id for house_id, part in parts.items() if not part]
+        detail_cache_stats.hit(len(parts) - len(missing_ids))
+        detail_cache_stats.miss(len(missing_ids))
+
+        if missing_ids:
+            houses = await self.fetch_house_details(missing_ids)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for house_id, house in houses.items():
+                    parts[house_id] = orjson.dumps(house)
+                    pipe.set(self.detail_cache_key(house_id), parts[house_id], ex=3600)
+                await pipe.execute()
+
+        return [RawJSON(parts[house_id]) if parts[house_id] else None for house_id in house_ids]
+
+    async def detail(self, house_id: int) -> Optional[RawJSON]:
+        return (await self.detail_parts([house_id]))[0]
+
+    async def details(self, house_ids: list) -> RawJSON:
+        if len(house_ids) > settings.HOUSE_DETAIL_BATCH_MAX:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"한 번에 {settings.HOUSE_DETAIL_BATCH_MAX}개까지 조회할 수 있습니다."
+            )
+        parts = await self.detail_parts(list(dict.fromkeys(house_ids)))
+        parts = {part_id: part for part_id, part in zip(dict.fromkeys(house_ids), parts)}
+        # 요청한 순서대로, 없는 집은 null로 채운 배열을 만듭니다.
+        return RawJSON(b"[" + b",".join(
+            parts[house_id].content if parts[house_id] else b"null" for house_id in house_ids
+        ) + b"]")
+
+    async def fetch_rec_houses_data(self, after_id: Optional[int] = None, offset: int = 0, size: int = settings.HOUSE_PAGE_SIZE) -> tuple:
+        # Recommendation.id 순서로 after_id 다음부터 size개를 가져옵니다. (size + 1개를 읽어 다음 페이지 여부를 확인)
         houses_query = select(
+            Recommendation.id,
             Recommendation.house_id,
             House.aptName,
             House.image_url,
@@ -260,52 +286,104 @@ class HouseService:
             Recommendation.user_id == self.user.id,
             Recommendation.is_deleted == False,
             House.is_deleted == False
-        ).limit(5).offset((page - 1) * 5)
-        houses = self.db.execute(houses_query).all()
+        ).order_by(Recommendation.id)
+        if after_id is not None:
+            houses_query = houses_query.filter(Recommendation.id > after_id)
+        houses = (await self.db.execute(houses_query.limit(size + 1).offset(offset))).all()
+        next_id = houses[size - 1][0] if len(houses) > size else None
+        houses = houses[:size]
 
-        liked_houses_set = {liked_house.house_id for liked_house in self.db.query(LikedHouse).filter(
-            LikedHouse.user_id == self.user.id,
-            LikedHouse.is_deleted == False
-        )}
+        like_states = await get_like_states(self.redis, self.db, self.user.id, [house[1] for house in houses])
 
         return [{
-            "house_id": house[0],
-            "aptName": house[1],
-            "image_url": house[2],
-            "exposureAddress": house[3],
-            "is_like": house[0] in liked_houses_set
-        } for house in houses]
+            "house_id": house[1],
+            "aptName": house[2],
+            "image_url": house[3],
+            "exposureAddress": house[4],
+            "is_like": is_like
+        } for house, is_like in zip(houses, like_states)], next_id
+    async def list_cache_key(self, name: str) -> str:
+        # 캐시 키에 사용자의 세대 번호를 넣어, 세대가 바뀌면 이전 캐시는 더 이상 읽히지 않게 합니다.
+        # (세대 번호는 db를 읽기 전에 가져와야 이전 데이터가 새 세대 키에 저장되지 않습니다.)
+        generation = await self.redis.get(list_generation_key(self.user.id)) or 0
+        return f"list:{self.user.id}:{generation}:{name}"
+
+    async def get_cached_list(self, redis_key: str) -> Optional[RawJSON]:
+        # 캐시된 JSON은 파싱하지 않고 그대로 응답에 사용합니다.
+        cached_data = await self.redis.get(redis_key)
+        if cached_data:
+            list_cache_stats.hit()
+            return RawJSON(cached_data)
+        list_cache_stats.miss()
+        return None
+
+    async def set_cached_list(self, redis_key: str, data) -> RawJSON:
+        data = orjson.dumps(data)
+        await self.redis.set(redis_key, data, ex=1800)
+        return RawJSON(data)
+
+    async def get_cached_page(self, redis_key: str) -> tuple:
+        # 커서 페이지는 다음 커서를 별도 키에 함께 저장해서, 캐시 적중 시에도 파싱 없이 다음 페이지를 미리 캐싱합니다.
+        cached_data, next_cursor = await self.redis.mget(redis_key, f"{redis_key}:next")
+        if cached_data:
+            list_cache_stats.hit()
+            return RawJSON(cached_data), next_cursor or None
+        list_cache_stats.miss()
+        return None, None
+
+    async def set_cached_page(self, redis_key: str, houses: list, next_cursor: Optional[str]) -> RawJSON:
+        data = orjson.dumps({"houses": houses, "next_cursor": next_cursor})
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(redis_key, data, ex=1800)
+            pipe.set(f"{redis_key}:next", next_cursor or "", ex=1800)
+            await pipe.execute()
+        return RawJSON(data)
 
     async def cache_recommendation_list(self, page) -> None:
-        redis_key = f"list:{self.user.id}:rec:{page}"
-        return_houses = await self.fetch_rec_houses_data(page)
-        await self.redis.set(redis_key, json.dumps(return_houses, ensure_ascii=False), ex=1800)
+        redis_key = await self.list_cache_key(f"rec:{page}")
+        if await self.redis.exists(redis_key):
+            return
+        return_houses, _ = await self.fetch_rec_houses_data(offset=(page - 1) * settings.HOUSE_PAGE_SIZE)
+        await self.set_cached_list(redis_key, return_houses)
 
-
-    async def recommendation_list(self, background_tasks: BackgroundTasks,  page: int) -> list:
+    async def recommendation_list(self, background_tasks: BackgroundTasks,  page: int) -> RawJSON:
 
         # backgroud task를 사용하여 다음 페이지의 데이터를 미리 캐싱합니다.
         background_tasks.add_task(self.cache_recommendation_list, page + 1)
 
-        # redis_key = f"list:{self.user.id}:rec:{page}"
-        # cached_data = await self.redis.get(redis_key)
-        #
-        # if cached_data:
-        #     return json.loads(cached_data)
+        redis_key = await self.list_cache_key(f"rec:{page}")
+        cached_data = await self.get_cached_list(redis_key)
+        if cached_data is not None:
+            return cached_data
 
-        return_houses = await self.fetch_rec_houses_data(page)
+        return_houses, _ = await self.fetch_rec_houses_data(offset=(page - 1) * settings.HOUSE_PAGE_SIZE)
 
         # redis에 데이터를 저장합니다.
-        # await self.redis.set(redis_key, json.dumps(return_houses, ensure_ascii=False), ex=1800)
-
-
-
-        return return_houses
-
-    async def fetch_house_list(self, page: int) -> list:
-
-        # House 테이블과 Recommendation 테이블을 left join하고,
-        # Recommendation 테이블의 house_id가 NULL인 경우만 필터링합니다.
+        return await self.set_cached_list(redis_key, return_houses)
+
+    async def cache_recommendation_list_by_cursor(self, cursor: Optional[str], size: int) -> None:
+        redis_key = await self.list_cache_key(f"rec:cursor:{cursor or ''}:{size}")
+        if await self.redis.exists(redis_key):
+            return
+        return_houses, next_id = await self.fetch_rec_houses_data(after_id=decode_cursor(cursor), size=size)
+        await self.set_cached_page(redis_key, return_houses, encode_cursor(next_id))
+
+    async def recommendation_list_by_cursor(self, background_tasks: BackgroundTasks, cursor: Optional[str], size: int) -> RawJSON:
+        redis_key = await self.list_cache_key(f"rec:cursor:{cursor or ''}:{size}")
+        return_data, next_cursor = await self.get_cached_page(redis_key)
+        if return_data is None:
+            return_houses, next_id = await self.fetch_rec_houses_data(after_id=decode_cursor(cursor), size=size)
+            next_cursor = encode_cursor(next_id)
+            return_data = await self.set_cached_page(redis_key, return_houses, next_cursor)
+
+        # 다음 페이지가 있으면 미리 캐싱합니다.
+        if next_cursor:
+            background_tasks.add_task(self.cache_recommendation_list_by_cursor, next_cursor, size)
+
+        return return_data
+
+    async def fetch_house_list(self, after_id: Optional[int] = None, offset: int = 0, size: int = settings.HOUSE_PAGE_SIZE) -> tuple:
+        # 사용자와 상관없는 집 목록 한 페이지를 가져옵니다. 좋아요 여부는 응답할 때 덧붙입니다.
         houses_query = select(
             House.id,
             House.aptName,
@@ -313,44 +391,72 @@ class HouseService:
             House.exposureAddress
         ).filter(
             House.is_deleted == False
-        ).limit(5).offset((page - 1) * 5)
-        houses = self.db.execute(houses_query).all()
-
-        # 사용자가 '좋아요'한 집 목록을 가져옵니다.
-        liked_houses_set = {liked_house.house_id for liked_house in self.db.query(LikedHouse).filter(
-            LikedHouse.user_id == self.user.id,
-            LikedHouse.is_deleted == False
-        )}
+        ).order_by(House.id)
+        if after_id is not None:
+            houses_query = houses_query.filter(House.id > after_id)
+        houses = (await self.db.execute(houses_query.limit(size + 1).offset(offset))).all()
+        next_id = houses[size - 1][0] if len(houses) > size else None
+        houses = houses[:size]
 
-        # 가져온 집 정보에 '좋아요' 정보를 추가하여 반환합니다.
         return [{
             "house_id": house[0],
             "aptName": house[1],
             "image_url": house[2],
-            "exposureAddress": house[3],
-            "is_like": house[0] in liked_houses_set
-        } for house in houses]
-
-    async def cache_house_list(self, page: int) -> None:
-        redis_key = f"list:{self.user.id}:house:{page}"
-        return_houses = await self.fetch_house_list(page)
-        await self.redis.set(redis_key, json.dumps(return_houses, ensure_ascii=False), ex=1800)
-
-    async def list(self, background_tasks: BackgroundTasks, page: int) -> list:
+            "exposureAddress": house[3]
+        } for house in houses], next_id
+
+    async def catalog_cache_key(self, name: str) -> str:
+        # 버전은 db를 읽기 전에 가져와야 이전 카탈로그가 새 버전 키에 저장되지 않습니다.
+        version = await self.redis.get(CATALOG_VERSION_KEY) or 0
+        return f"houses:{version}:{name}"
+
+    async def cache_catalog_page(self, redis_key: str, after_id: Optional[int], offset: int, size: int) -> tuple:
+        houses, next_id = await self.fetch_house_list(after_id=after_id, offset=offset, size=size)
+        next_cursor = encode_cursor(next_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(redis_key, orjson.dumps(houses), ex=1800)
+            pipe.set(f"{redis_key}:next", next_cursor or "", ex=1800)
+            await pipe.execute()
+        return houses, next_cursor
+
+    async def get_catalog_page(self, name: str, after_id: Optional[int] = None, offset: int = 0, size: int = settings.HOUSE_PAGE_SIZE) -> tuple:
+        redis_key = await self.catalog_cache_key(name)
+        cached_data, next_cursor = await self.redis.mget(redis_key, f"{redis_key}:next")
+        if cached_data:
+            catalog_cache_stats.hit()
+            return orjson.loads(cached_data), next_cursor or None
+        catalog_cache_stats.miss()
+        return await self.cache_catalog_page(redis_key, after_id, offset, size)
+
+    async def prefetch_catalog_page(self, name: str, after_id: Optional[int] = None, offset: int = 0, size: int = settings.HOUSE_PAGE_SIZE) -> None:
+        redis_key = await self.catalog_cache_key(name)
+        if await self.redis.exists(redis_key):
+            return
+        await self.cache_catalog_page(redis_key, after_id, offset, size)
+
+    async def add_like_states(self, houses: list) -> list:
+        # Redis의 좋아요 집합에서 이 페이지 집들의 '좋아요' 여부만 확인해서 덧붙입니다.
+        like_states = await get_like_states(self.redis, self.db, self.user.id, [house["house_id"] for house in houses])
+        for house, is_like in zip(houses, like_states):
+            house["is_like"] = is_like
+        return houses
+
+    async def list(self, background_tasks: BackgroundTasks, page: int) -> RawJSON:
 
         # backgroud task를 사용하여 다음 페이지의 데이터를 미리 캐싱합니다.
-        # background_tasks.add_task(self.cache_house_list, page + 1)
+        offset = (page - 1) * settings.HOUSE_PAGE_SIZE
+        background_tasks.add_task(self.prefetch_catalog_page, f"page:{page + 1}", offset=offset + settings.HOUSE_PAGE_SIZE)
 
-        # redis에 저장된 데이터를 가져옵니다.
-        # redis_key = f"list:{self.user.id}:house:{page}"
-        # redis_data = await self.redis.get(redis_key)
+        houses, _ = await self.get_catalog_page(f"page:{page}", offset=offset)
+        return RawJSON(orjson.dumps(await self.add_like_states(houses)))
 
-        # if redis_data:
-        #     return json.loads(redis_data)
+    async def list_by_cursor(self, background_tasks: BackgroundTasks, cursor: Optional[str], size: int) -> RawJSON:
+        houses, next_cursor = await self.get_catalog_page(f"cursor:{cursor or ''}:{size}", after_id=decode_cursor(cursor), size=size)
 
-        return_houses = await self.fetch_house_list(page)
-
-        # redis에 데이터를 저장합니다.
-        # await self.redis.set(redis_key, json.dumps(return_houses, ensure_ascii=False), ex=1800)
+        # 다음 페이지가 있으면 미리 캐싱합니다.
+        if next_cursor:
+            background_tasks.add_task(
+                self.prefetch_catalog_page, f"cursor:{next_cursor}:{size}", after_id=decode_cursor(next_cursor), size=size
+            )
 
-        return return_houses
\ No newline at end of file
+        return RawJSON(orjson.dumps({"houses": await self.add_like_states(houses), "next_cursor": next_cursor}))
@@ -0,0 +1,246 @@
+import asyncio
+import os
+from typing import Optional
+
+import aioredis
+from sqlalchemy import select, update, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import bulk_insert_db, get_SessionLocal, create_redis_client, RELEASE_LOCK_SCRIPT
+from app.db.memory_redis import register_script
+from app.db.models import LikedHouse, House, User
+
+# 사용자별 좋아요 상태는 Redis 집합(likes:{user_id})에 두고, 바뀐 내용은 likes:dirty 해시에 모아
+# LikeFlusher가 주기적으로 LikedHouse 테이블에 저장합니다 (write-behind).
+# 저장 중인 변경은 likes:dirty:processing으로 옮겨 두고 db 커밋이 끝난 뒤에 지우므로,
+# 저장 도중 워커가 죽어도 다음 저장에서 다시 반영됩니다.
+# 집합에는 항상 LIKE_SENTINEL이 들어 있어서, 키가 없으면 아직 db에서 읽지 않은 사용자로 봅니다.
+LIKE_SENTINEL = "0"
+LIKES_DIRTY_KEY = "likes:dirty"
+LIKES_PROCESSING_KEY = "likes:dirty:processing"
+LIKES_FLUSH_LOCK_KEY = "likes:flush:lock"
+LIKE_COLD = -1
+
+
+def likes_key(user_id: int) -> str:
+    return f"likes:{user_id}"
+
+
+LOAD_LIKES_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 2, #ARGV do
+    redis.call('SADD', KEYS[1], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+@register_script(LOAD_LIKES_SCRIPT)
+async def load_likes_in_memory(redis, keys: list, args: list) -> int:
+    if await redis.exists(keys[0]):
+        return 0
+    await redis.sadd(keys[0], *args[1:])
+    await redis.expire(keys[0], int(args[0]))
+    return 1
+
+
+CHECK_LIKES_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local result = {}
+for i = 1, #ARGV do
+    result[i] = redis.call('SISMEMBER', KEYS[1], ARGV[i])
+end
+return result
+"""
+
+
+@register_script(CHECK_LIKES_SCRIPT)
+async def check_likes_in_memory(redis, keys: list, args: list):
+    if not await redis.exists(keys[0]):
+        return LIKE_COLD
+    return [int(await redis.sismember(keys[0], house_id)) for house_id in args]
+
+
+TOGGLE_LIKE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local liked = 1
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 1 then
+    redis.call('SREM', KEYS[1], ARGV[1])
+    liked = 0
+else
+    redis.call('SADD', KEYS[1], ARGV[1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('HSET', KEYS[2], ARGV[2] .. ':' .. ARGV[1], liked)
+return liked
+"""
+
+
+@register_script(TOGGLE_LIKE_SCRIPT)
+async def toggle_like_in_memory(redis, keys: list, args: list) -> int:
+    house_id, user_id, ttl = args
+    if not await redis.exists(keys[0]):
+        return LIKE_COLD
+    if await redis.sismember(keys[0], house_id):
+        await redis.srem(keys[0], house_id)
+        liked = 0
+    else:
+        await redis.sadd(keys[0], house_id)
+        liked = 1
+    await redis.expire(keys[0], int(ttl))
+    await redis.hset(keys[1], f"{user_id}:{house_id}", liked)
+    return liked
+
+
+# 이전 저장이 끝나지 못해 KEYS[2]가 남아 있으면 그 변경부터 다시 저장하고,
+# 없으면 KEYS[1]을 KEYS[2]로 옮겨서 저장합니다.
+DRAIN_DIRTY_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return {}
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
+
+@register_script(DRAIN_DIRTY_SCRIPT)
+async def drain_dirty_in_memory(redis, keys: list, args: list) -> list:
+    if not await redis.exists(keys[1]):
+        if not await redis.exists(keys[0]):
+            return []
+        await redis.rename(keys[0], keys[1])
+    changes = await redis.hgetall(keys[1])
+    return [item for field_value in changes.items() for item in field_value]
+
+
+async def load_likes(redis: aioredis.Redis, db: AsyncSession, user_id: int) -> None:
+    # 처음 보는 사용자(또는 TTL이 지난 사용자)의 좋아요 집합을 db에서 다시 만듭니다.
+    # 이미 다른 요청이 만들었다면 스크립트가 덮어쓰지 않습니다.
+    house_ids = await db.scalars(select(LikedHouse.house_id).filter(
+        LikedHouse.user_id == user_id,
+        LikedHouse.is_deleted == False
+    ))
+    await redis.eval(LOAD_LIKES_SCRIPT, 1, likes_key(user_id), settings.LIKE_CACHE_TTL, LIKE_SENTINEL, *house_ids)
+
+
+async def get_like_states(redis: aioredis.Redis, db: AsyncSession, user_id: int, house_ids: list) -> list:
+    if not house_ids:
+        return []
+    states = await redis.eval(CHECK_LIKES_SCRIPT, 1, likes_key(user_id), *house_ids)
+    if states == LIKE_COLD:
+        await load_likes(redis, db, user_id)
+        states = await redis.eval(CHECK_LIKES_SCRIPT, 1, likes_key(user_id), *house_ids)
+    return [bool(state) for state in states]
+
+
+async def toggle_like(redis: aioredis.Redis, db: AsyncSession, user_id: int, house_id: int) -> bool:
+    args = (2, likes_key(user_id), LIKES_DIRTY_KEY, house_id, user_id, settings.LIKE_CACHE_TTL)
+    liked = await redis.eval(TOGGLE_LIKE_SCRIPT, *args)
+    if liked == LIKE_COLD:
+        await load_likes(redis, db, user_id)
+        liked = await redis.eval(TOGGLE_LIKE_SCRIPT, *args)
+    return bool(liked)
+
+
+async def persist_likes(db: AsyncSession, changes: dict) -> None:
+    # {(user_id, house_id): 좋아요 여부}를 한 트랜잭션으로 LikedHouse에 반영합니다.
+    rows = (await db.execute(select(LikedHouse.id, LikedHouse.user_id, LikedHouse.house_id).filter(
+        tuple_(LikedHouse.user_id, LikedHouse.house_id).in_(list(changes))
+    ))).all()
+    existing_pairs = {(row.user_id, row.house_id) for row in rows}
+    liked_ids = [row.id for row in rows if changes[(row.user_id, row.house_id)]]
+    unliked_ids = [row.id for row in rows if not changes[(row.user_id, row.house_id)]]
+    new_rows = [{"user_id": user_id, "house_id": house_id}
+                for (user_id, house_id), liked in changes.items() if liked and (user_id, house_id) not in existing_pairs]
+
+    # 집이나 사용자가 없는 좋아요는 외래 키 때문에 저장할 수 없으므로 건너뜁니다.
+    # 한 행 때문에 배치가 실패하면 likes:dirty:processing이 계속 남아 이후 저장이 모두 막힙니다.
+    if new_rows:
+        house_ids = set(await db.scalars(select(House.id).filter(House.id.in_({row["house_id"] for row in new_rows}))))
+        user_ids = set(await db.scalars(select(User.id).filter(User.id.in_({row["user_id"] for row in new_rows}))))
+        skipped = [row for row in new_rows if row["house_id"] not in house_ids or row["user_id"] not in user_ids]
+        if skipped:
+            print(f"저장할 수 없는 좋아요 {len(skipped)}건을 건너뜁니다: {skipped[:10]!r}")
+            new_rows = [row for row in new_rows if row["house_id"] in house_ids and row["user_id"] in user_ids]
+
+    try:
+        if liked_ids:
+            await db.execute(update(LikedHouse).where(LikedHouse.id.in_(liked_ids)).values(is_deleted=False))
+        if unliked_ids:
+            await db.execute(update(LikedHouse).where(LikedHouse.id.in_(unliked_ids)).values(is_deleted=True))
+    except:
+        await db.rollback()
+        raise
+    # 새 행 INSERT와 함께 커밋되므로 UPDATE까지 한 번에 반영되거나 한 번에 롤백됩니다.
+    if new_rows:
+        await bulk_insert_db(LikedHouse, new_rows, db)
+    else:
+        await db.commit()
+
+
+class LikeFlusher:
+    # likes:dirty에 쌓인 좋아요 변경을 주기적으로 db에 저장합니다.
+    # 여러 워커가 동시에 저장하면 순서가 뒤바뀔 수 있어 락을 잡은 워커 하나만 저장합니다.
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.redis: Optional[aioredis.Redis] = None
+        self.task: Optional[asyncio.Task] = None
+        self.lock_token = f"{os.getpid()}:{id(self)}"
+
+    async def start(self) -> None:
+        self.redis = create_redis_client()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        # 종료 전에 남은 변경을 저장합니다.
+        if self.redis is not None:
+            await self.flush()
+
+    async def run(self) -> None:
+        # 시작하자마자 한 번 저장해서, 이전에 죽은 워커가 남긴 likes:dirty:processing을 반영합니다.
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"좋아요 저장 실패: {e!r}")
+            await asyncio.sleep(self.interval)
+
+    async def flush(self) -> int:
+        if not await self.redis.set(LIKES_FLUSH_LOCK_KEY, self.lock_token, nx=True, ex=60):
+            return 0
+        try:
+            drained = await self.redis.eval(DRAIN_DIRTY_SCRIPT, 2, LIKES_DIRTY_KEY, LIKES_PROCESSING_KEY)
+            changes = {}
+            for field, liked in zip(drained[::2], drained[1::2]):
+                user_id, house_id = field.split(":")
+                changes[(int(user_id), int(house_id))] = liked == "1"
+
+            # 저장에 실패하면 likes:dirty:processing이 그대로 남아 다음 저장에서 다시 반영됩니다.
+            # 그 사이 새로 바뀐 값은 likes:dirty에 쌓였다가 그다음에 저장되므로 최신 값이 남습니다.
+            # (이미 커밋한 배치를 다시 저장해도 결과는 같습니다)
+            items = list(changes.items())
+            for start in range(0, len(items), self.batch_size):
+                async with get_SessionLocal()() as db:
+                    await persist_likes(db, dict(items[start:start + self.batch_size]))
+            await self.redis.delete(LIKES_PROCESSING_KEY)
+            return len(changes)
+        finally:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, LIKES_FLUSH_LOCK_KEY, self.lock_token)
+
+
+like_flusher = LikeFlusher(settings.LIKE_FLUSH_INTERVAL, settings.LIKE_FLUSH_BATCH_SIZE)
@@ -0,0 +1,656 @@
+import asyncio
+import copy
+import hashlib
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np
+from scipy import sparse
+from fastapi import HTTPException, status
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import House, CatalogRevision
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+# 추천에 필요한 집 컬럼만 인덱스에 보관합니다.
+INDEX_COLUMNS = [
+    "id",
+    "aptName",
+    "tagList",
+    "articleFeatureDescription",
+    "detailDescription",
+    "walkTime",
+    "studentCountPerTeacher",
+    "aptParkingCountPerHousehold",
+]
+
+# 증분 추가된 집이 전체의 이 비율을 넘으면 어휘/IDF를 다시 학습합니다.
+REFIT_RATIO = 0.1
+
+# 디스크 인덱스 형식 버전. 저장 형식이 바뀌면 올려서 이전 파일을 다시 만들게 합니다.
+INDEX_FORMAT_VERSION = 2
+INDEX_ARRAYS = ["idf", "matrix_data", "matrix_indices", "matrix_indptr", "ids", "apt_name_codes",
+                "room_counts", "text_norms", "eligible", "inverse_house_norms", "house_offsets"]
+
+# /chat에서 받을 수 있는 페르소나 범주형 값 (check_format에서 검사합니다)
+PERSON_COUNTS = ["1명", "2명", "3명", "4명 이상"]
+PERIODS = ["1주", "2주", "3주", "4주 이상"]
+IDENTITIES = ["학생", "직장인", "기타"]
+CARS = ["자차", "대중교통"]
+CHILDREN = ["아이 있음", "아이 없음"]
+
+
+def extract_room_count(house: dict) -> int:
+    room_tags = [tag for tag in house['tagList'] if '방' in tag]
+    room_count_map = {"한개": 1, "두개": 2, "세개": 3, "네개": 4, "다섯개": 5}
+
+    if room_tags:
+        for key, value in room_count_map.items():
+            if key in room_tags[0]:
+                return value
+    return 1
+
+
+def house_to_text(house: dict) -> str:
+    return ' '.join(house['tagList']) + ' ' + \
+        house['articleFeatureDescription'] + \
+        (" " + house['detailDescription'] if house['detailDescription'] != "없음" else "")
+
+
+def vectorize_categorical_data(persona: dict) -> np.ndarray:
+    person_count = int(persona['person_count'].replace('명', '').split()[0])
+
+    if '한달' in persona['period'] or '이상' in persona['period']:
+        period = 4
+    else:
+        period = int(persona['period'].replace('주', ''))
+
+    identity_vector = [1 if identity in persona['identity'] else 0 for identity in
+                       ['학생', '직장인', '취준생', '기타']]
+    car = 1 if persona['car'] == '차 있음' else 0
+    child = 1 if persona['child'] == '아이 있음' else 0
+
+    return np.array([person_count, period] + identity_vector + [car, child])
+
+
+def persona_norm_key(persona: dict) -> tuple:
+    # 집 벡터의 크기는 (인원 수, 범주형 벡터의 크기 제곱)에만 의존합니다.
+    categorical_vector = vectorize_categorical_data(persona)
+    return int(categorical_vector[0]), float(categorical_vector @ categorical_vector)
+
+
+def persona_norm_keys() -> list:
+    # 받을 수 있는 모든 범주형 조합에서 나오는 (인원 수, 범주형 벡터 크기 제곱) 목록
+    return sorted({
+        persona_norm_key({"person_count": person_count, "period": period, "identity": identity, "car": car, "child": child})
+        for person_count, period, identity, car, child in itertools.product(PERSON_COUNTS, PERIODS, IDENTITIES, CARS, CHILDREN)
+    })
+
+
+def make_catalog_version(revision: int, house_count: int, max_id: Optional[int]) -> str:
+    return f"{revision}:{house_count}:{max_id or 0}"
+
+
+def next_catalog_version(catalog_version: str, house_id: int) -> str:
+    # catalog_version인 카탈로그에 집 하나(house_id)만 추가했을 때의 버전입니다.
+    revision, house_count, max_id = (int(value) for value in catalog_version.split(":"))
+    return make_catalog_version(revision + 1, house_count + 1, max(max_id, house_id))
+
+
+async def get_catalog_version(db: AsyncSession) -> str:
+    # 카탈로그 번호와 삭제되지 않은 집의 수, 최대 id로 카탈로그가 바뀌었는지 판단합니다.
+    # 집 내용만 바뀌어도 번호가 올라가므로 수와 id가 같아도 다른 버전이 됩니다.
+    revision = await db.scalar(select(CatalogRevision.revision).filter(CatalogRevision.id == 1))
+    house_count, max_id = (await db.execute(select(func.count(House.id), func.max(House.id)).filter(
+        House.is_deleted == False
+    ))).one()
+    return make_catalog_version(revision or 0, house_count, max_id)
+
+
+async def bump_catalog_revision(db: AsyncSession) -> None:
+    # 집을 저장하는 트랜잭션 안에서 호출합니다. (커밋은 호출한 쪽에서 합니다)
+    result = await db.execute(
+        update(CatalogRevision).where(CatalogRevision.id == 1).values(revision=CatalogRevision.revision + 1)
+    )
+    if result.rowcount == 0:
+        db.add(CatalogRevision(id=1, revision=1))
+
+
+def hash_directory(path: str) -> str:
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(path)):
+        digest.update(name.encode())
+        with open(os.path.join(path, name), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_content_hash(version_path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(version_path, "meta.json")) as f:
+            return json.load(f).get("content_hash")
+    except (OSError, ValueError):
+        return None
+
+
+def read_current_version(path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(path, "CURRENT")) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class HouseStore:
+    # houses.jsonl을 mmap으로 열어 두고, 요청된 집만 그때그때 읽어 옵니다.
+    def __init__(self, path: str, offsets: np.ndarray):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> dict:
+        return json.loads(self.buffer[self.offsets[position]:self.offsets[position + 1]])
+
+    def __iter__(self):
+        return (self[position] for position in range(len(self)))
+
+
+# 학습된 TF-IDF 어휘와 집 벡터(CSR 행렬)를 house id 기준으로 보관하는 인덱스
+class HouseIndex:
+    def __init__(self, tfidf_vectorizer: "TfidfVectorizer", matrix: sparse.csr_matrix, houses,
+                 catalog_version: Optional[str] = None, arrays: Optional[dict] = None):
+        self.tfidf_vectorizer = tfidf_vectorizer
+        self.matrix = matrix
+        self.houses = houses
+        self.catalog_version = catalog_version
+        # mmap으로 연 경우 버전 디렉터리 이름 (CURRENT와 비교해서 새 인덱스를 감지합니다)
+        self.artifact_version: Optional[str] = None
+        self.added_count = 0
+        if arrays is None:
+            self.refresh_arrays()
+        else:
+            # 디스크에서 읽은 배열은 다시 계산하지 않고 그대로 씁니다.
+            for name in ["ids", "room_counts", "text_norms", "eligible", "apt_name_codes", "inverse_house_norms"]:
+                setattr(self, name, arrays[name])
+            self.positions = {house_id: i for i, house_id in enumerate(self.ids.tolist())}
+            self.norm_positions = {key: i for i, key in enumerate(arrays["norm_keys"])}
+            self.apt_name_code_map: Optional[dict] = None
+
+    def refresh_arrays(self) -> None:
+        # 점수 계산에 쓰이는 집별 값들을 numpy 배열로 미리 만들어 둡니다.
+        self.ids = np.array([house['id'] for house in self.houses], dtype=np.int64)
+        self.positions = {house['id']: i for i, house in enumerate(self.houses)}
+        self.room_counts = np.array([extract_room_count(house) for house in self.houses], dtype=np.float64)
+        self.text_norms = np.asarray(self.matrix.multiply(self.matrix).sum(axis=1), dtype=np.float64).ravel()
+        self.eligible = np.array([
+            int(house['walkTime']) <= 10 and float(house['aptParkingCountPerHousehold']) > 0
+            for house in self.houses
+        ], dtype=bool)
+        self.apt_name_code_map = {}
+        self.apt_name_codes = np.array([
+            self.apt_name_code_map.setdefault(house['aptName'], len(self.apt_name_code_map)) for house in self.houses
+        ], dtype=np.int64)
+
+        # 가능한 범주형 조합마다 1 / |집 벡터|를 미리 계산해 둡니다.
+        # 질의 시에는 텍스트 유사도만 계산하면 됩니다.
+        # 집 수 x 조합 수만큼 커지므로 float32로 저장합니다. (50만 개 기준 128MB -> 64MB)
+        norm_keys = persona_norm_keys()
+        self.norm_positions = {key: i for i, key in enumerate(norm_keys)}
+        self.inverse_house_norms = np.empty((len(norm_keys), len(self.houses)), dtype=np.float32)
+        for i, (person_count, categorical_norm) in enumerate(norm_keys):
+            self.inverse_house_norms[i] = self.compute_inverse_house_norms(person_count, categorical_norm)
+
+    def compute_inverse_house_norms(self, person_count, categorical_norm, text_norms=None, room_counts=None) -> np.ndarray:
+        # 집 벡터 = [페르소나 범주형 벡터, 집 텍스트 벡터, 방 개수 - 인원 수]
+        text_norms = self.text_norms if text_norms is None else text_norms
+        room_counts = self.room_counts if room_counts is None else room_counts
+        return 1 / np.sqrt(categorical_norm + text_norms + (room_counts - person_count) ** 2)
+
+    def set_house_arrays(self, position: int, house: dict, row: sparse.csr_matrix) -> None:
+        # 집 하나의 값과 범주형 조합별 1 / |집 벡터| 열만 계산해서 채웁니다.
+        # 요청 처리 중인 이전 인덱스와 배열을 공유하지 않도록 항상 새 배열에 씁니다.
+        size = len(self.houses)
+        if self.apt_name_code_map is None:
+            self.apt_name_code_map = {}
+            for name, code in zip((h['aptName'] for h in self.houses), self.apt_name_codes.tolist()):
+                self.apt_name_code_map.setdefault(name, code)
+        else:
+            self.apt_name_code_map = dict(self.apt_name_code_map)
+        apt_name_code = self.apt_name_code_map.setdefault(house['aptName'], int(self.apt_name_codes.max(initial=-1)) + 1)
+
+        def resized(array: np.ndarray) -> np.ndarray:
+            result = np.empty(array.shape[:-1] + (size,), dtype=array.dtype)
+            count = min(array.shape[-1], size)
+            result[..., :count] = array[..., :count]
+            return result
+
+        self.ids, self.room_counts, self.text_norms, self.eligible, self.apt_name_codes, self.inverse_house_norms = [
+            resized(array) for array in
+            [self.ids, self.room_counts, self.text_norms, self.eligible, self.apt_name_codes, self.inverse_house_norms]
+        ]
+        self.ids[position] = house['id']
+        self.room_counts[position] = extract_room_count(house)
+        self.text_norms[position] = np.asarray(row.multiply(row).sum(axis=1), dtype=np.float64).ravel()[0]
+        self.eligible[position] = int(house['walkTime']) <= 10 and float(house['aptParkingCountPerHousehold']) > 0
+        self.apt_name_codes[position] = apt_name_code
+        for (person_count, categorical_norm), i in self.norm_positions.items():
+            self.inverse_house_norms[i, position] = self.compute_inverse_house_norms(
+                person_count, categorical_norm, self.text_norms[position], self.room_counts[position]
+            )
+        self.positions = dict(self.positions)
+        self.positions[house['id']] = position
+
+    def get_inverse_house_norms(self, person_count: int, categorical_norm: float) -> np.ndarray:
+        position = self.norm_positions.get((person_count, categorical_norm))
+        if position is None:
+            return self.compute_inverse_house_norms(person_count, categorical_norm)
+        return self.inverse_house_norms[position]
+
+    @classmethod
+    def build(cls, houses: list, catalog_version: Optional[str] = None) -> "HouseIndex":
+        # scikit-learn은 import가 무거워서 인덱스를 만들거나 열 때 가져옵니다.
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        houses = [{column: house[column] for column in INDEX_COLUMNS} for house in houses]
+        tfidf_vectorizer = TfidfVectorizer()
+        matrix = tfidf_vectorizer.fit_transform([house_to_text(house) for house in houses])
+        if catalog_version is None:
+            catalog_version = make_catalog_version(0, len(houses), max(house['id'] for house in houses))
+        return cls(tfidf_vectorizer, sparse.csr_matrix(matrix), houses, catalog_version)
+
+    @classmethod
+    async def from_db(cls, db: AsyncSession) -> Optional["HouseIndex"]:
+        catalog_version, houses = await fetch_index_houses(db)
+        if not houses:
+            return None
+        return cls.build(houses, catalog_version)
+
+    @classmethod
+    def load(cls, path: str, version: Optional[str] = None) -> Optional["HouseIndex"]:
+        # path/CURRENT(또는 주어진 버전)가 가리키는 버전 디렉터리를 mmap으로 엽니다.
+        # 여러 워커가 같은 파일을 열면 OS 페이지 캐시를 공유합니다.
+        version = version or read_current_version(path)
+        if not version:
+            return None
+        version_path = os.path.join(path, version)
+        try:
+            with open(os.path.join(version_path, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("format_version") != INDEX_FORMAT_VERSION:
+            return None
+
+        arrays = {name: np.load(os.path.join(version_path, f"{name}.npy"), mmap_mode='r') for name in INDEX_ARRAYS}
+        with open(os.path.join(version_path, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        tfidf_vectorizer = TfidfVectorizer()
+        tfidf_vectorizer.vocabulary_ = {term: i for i, term in enumerate(vocabulary)}
+        tfidf_vectorizer.idf_ = np.asarray(arrays["idf"])
+        arrays["norm_keys"] = [tuple(key) for key in meta["norm_keys"]]
+        matrix = sparse.csr_matrix(
+            (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]),
+            shape=(meta["house_count"], len(vocabulary)),
+            copy=False,
+        )
+        houses = HouseStore(os.path.join(version_path, "houses.jsonl"), arrays["house_offsets"])
+        house_index = cls(tfidf_vectorizer, matrix, houses, meta["catalog_version"], arrays)
+        house_index.added_count = meta["added_count"]
+        house_index.artifact_version = version
+        return house_index
+
+    def save(self, path: str) -> str:
+        # 버전 디렉터리를 새로 쓰고 CURRENT만 원자적으로 바꿉니다.
+        # 이전 버전 파일을 mmap으로 열고 있는 워커는 그대로 계속 읽을 수 있습니다.
+        # 디렉터리 이름에 카탈로그 버전과 내용 해시를 넣어서, 내용이 다르면 항상 다른 디렉터리가 됩니다.
+        tmp_path = os.path.join(path, f"v.tmp{os.getpid()}-{id(self)}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        vocabulary = sorted(self.tfidf_vectorizer.vocabulary_, key=self.tfidf_vectorizer.vocabulary_.get)
+        offsets = [0]
+        with open(os.path.join(tmp_path, "houses.jsonl"), 'wb') as f:
+            for house in self.houses:
+                line = json.dumps(house, ensure_ascii=False).encode()
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+        arrays = {
+            "idf": self.tfidf_vectorizer.idf_,
+            "matrix_data": self.matrix.data,
+            "matrix_indices": self.matrix.indices,
+            "matrix_indptr": self.matrix.indptr,
+            "ids": self.ids,
+            "apt_name_codes": self.apt_name_codes,
+            "room_counts": self.room_counts,
+            "text_norms": self.text_norms,
+            "eligible": self.eligible,
+            "inverse_house_norms": self.inverse_house_norms,
+            "house_offsets": np.array(offsets, dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(array))
+        with open(os.path.join(tmp_path, "vocabulary.json"), 'w') as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+
+        content_hash = hash_directory(tmp_path)
+        with open(os.path.join(tmp_path, "meta.json"), 'w') as f:
+            json.dump({
+                "format_version": INDEX_FORMAT_VERSION,
+                "catalog_version": self.catalog_version,
+                "content_hash": content_hash,
+                "house_count": len(self.houses),
+                "added_count": self.added_count,
+                "norm_keys": sorted(self.norm_positions, key=self.norm_positions.get),
+            }, f)
+
+        version = f"v{INDEX_FORMAT_VERSION}-{self.catalog_version.replace(':', '-')}-{content_hash[:12]}"
+        version_path = os.path.join(path, version)
+        try:
+            os.rename(tmp_path, version_path)
+        except OSError:
+            if read_content_hash(version_path) == content_hash:
+                # 다른 워커가 같은 내용을 먼저 저장했습니다.
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            else:
+                # 같은 이름의 디렉터리가 다른 내용(또는 쓰다 만 파일)이면 새 내용으로 바꿉니다.
+                old_path = f"{version_path}.old{os.getpid()}"
+                os.rename(version_path, old_path)
+                os.rename(tmp_path, version_path)
+                shutil.rmtree(old_path, ignore_errors=True)
+
+        current_tmp_path = os.path.join(path, f"CURRENT.tmp{os.getpid()}")
+        with open(current_tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(current_tmp_path, os.path.join(path, "CURRENT"))
+
+        for name in os.listdir(path):
+            if name.startswith("v") and name != version and ".tmp" not in name:
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        return version
+
+    def add(self, house: dict, catalog_version: str) -> None:
+        house = {column: house[column] for column in INDEX_COLUMNS}
+        if isinstance(self.houses, HouseStore):
+            self.houses = list(self.houses)
+
+        # 새로 추가된 집이 많아지면 전체를 다시 학습합니다.
+        if self.added_count + 1 > len(self.houses) * REFIT_RATIO:
+            rebuilt = HouseIndex.build([h for h in self.houses if h['id'] != house['id']] + [house])
+            self.tfidf_vectorizer, self.matrix, self.houses = rebuilt.tfidf_vectorizer, rebuilt.matrix, rebuilt.houses
+            self.catalog_version = catalog_version
+            self.added_count = 0
+            self.refresh_arrays()
+            return
+
+        # 기존 어휘로 새 집만 벡터화해서 행을 추가하고, 그 집의 배열 값만 계산합니다.
+        row = sparse.csr_matrix(self.tfidf_vectorizer.transform([house_to_text(house)]))
+        if house['id'] in self.positions:
+            position = self.positions[house['id']]
+            matrix = self.matrix.tolil()
+            matrix[position] = row
+            self.matrix = matrix.tocsr()
+            self.houses[position] = house
+        else:
+            position = len(self.houses)
+            self.matrix = sparse.vstack([self.matrix, row], format='csr')
+            self.houses.append(house)
+        self.set_house_arrays(position, house, row)
+        self.added_count += 1
+        self.catalog_version = catalog_version
+
+
+_house_index: Optional[HouseIndex] = None
+_house_index_checked_at = 0.0
+# 인덱스를 새로 만들거나 집을 추가하는 작업을 하나씩 실행합니다. (이벤트 루프가 생긴 뒤에 만듭니다)
+_house_index_lock: Optional[asyncio.Lock] = None
+
+
+def get_house_index_lock() -> asyncio.Lock:
+    global _house_index_lock
+    if _house_index_lock is None:
+        _house_index_lock = asyncio.Lock()
+    return _house_index_lock
+
+
+async def fetch_index_houses(db: AsyncSession) -> tuple:
+    catalog_version = await get_catalog_version(db)
+    houses = (await db.execute(select(*[getattr(House, column) for column in INDEX_COLUMNS]).filter(
+        House.is_deleted == False
+    ).order_by(House.id))).all()
+    return catalog_version, [house._asdict() for house in houses]
+
+
+async def load_house_index(db: AsyncSession) -> Optional[HouseIndex]:
+    # 저장된 인덱스가 현재 카탈로그와 같으면 그대로 쓰고, 없거나 오래됐으면 db에서 새로 만듭니다.
+    global _house_index
+    if settings.HOUSE_INDEX_PATH:
+        house_index = HouseIndex.load(settings.HOUSE_INDEX_PATH)
+        if house_index is not None and house_index.catalog_version == await get_catalog_version(db):
+            _house_index = house_index
+            return _house_index
+        print("저장된 추천 인덱스가 없거나 오래되어 다시 만듭니다.")
+    return await refresh_house_index(db)
+
+
+def save_house_index(house_index: HouseIndex) -> HouseIndex:
+    # 저장한 뒤 mmap으로 다시 열어서 다른 워커와 같은 페이지를 쓰게 합니다.
+    version = house_index.save(settings.HOUSE_INDEX_PATH)
+    return HouseIndex.load(settings.HOUSE_INDEX_PATH, version) or house_index
+
+
+def build_house_index(houses: list, catalog_version: str) -> HouseIndex:
+    house_index = HouseIndex.build(houses, catalog_version)
+    return save_house_index(house_index) if settings.HOUSE_INDEX_PATH else house_index
+
+
+def add_house(house_index: HouseIndex, house: dict, catalog_version: str) -> HouseIndex:
+    # 요청 처리 중인 인덱스를 건드리지 않도록 복사본에 추가합니다.
+    # (add는 배열과 행렬을 새로 만들어 바꾸므로 집 목록만 따로 복사하면 됩니다)
+    house_index = copy.copy(house_index)
+    house_index.houses = list(house_index.houses)
+    house_index.add(house, catalog_version)
+    return save_house_index(house_index) if settings.HOUSE_INDEX_PATH else house_index
+
+
+async def refresh_house_index(db: AsyncSession) -> Optional[HouseIndex]:
+    # TF-IDF 학습과 파일 저장은 스레드에서 실행하고, 끝나면 인덱스를 한 번에 바꿉니다.
+    # 그동안 요청은 이전 인덱스로 계속 처리됩니다.
+    global _house_index
+    async with get_house_index_lock():
+        catalog_version, houses = await fetch_index_houses(db)
+        if not houses:
+            _house_index = None
+            return None
+        _house_index = await asyncio.get_running_loop().run_in_executor(
+            None, build_house_index, houses, catalog_version
+        )
+        return _house_index
+
+
+def reload_current_house_index() -> None:
+    # 다른 워커가 CURRENT를 새 인덱스로 바꿨으면 그 인덱스를 엽니다.
+    global _house_index
+    version = read_current_version(settings.HOUSE_INDEX_PATH)
+    if version and (_house_index is None or version != _house_index.artifact_version):
+        _house_index = HouseIndex.load(settings.HOUSE_INDEX_PATH, version) or _house_index
+
+
+async def add_to_house_index(db: AsyncSession, house: House) -> None:
+    # 집을 커밋한 뒤에 호출합니다.
+    # 인덱스가 이 집을 넣기 직전의 카탈로그일 때만 집 하나를 추가하고, 다른 워커가 그 사이 집을 추가했거나
+    # 이 워커의 인덱스가 뒤처져 있으면 전체를 다시 만듭니다. 인덱스에 없는 집까지 포함한 버전을 붙이지 않기 위해서입니다.
+    global _house_index
+    async with get_house_index_lock():
+        if settings.HOUSE_INDEX_PATH:
+            reload_current_house_index()
+        catalog_version = await get_catalog_version(db)
+        if _house_index is not None and next_catalog_version(_house_index.catalog_version, house.id) == catalog_version:
+            _house_index = await asyncio.get_running_loop().run_in_executor(
+                None, add_house, _house_index,
+                {column: getattr(house, column) for column in INDEX_COLUMNS}, catalog_version
+            )
+            return
+    await refresh_house_index(db)
+
+
+async def get_house_index(db: AsyncSession) -> Optional[HouseIndex]:
+    global _house_index, _house_index_checked_at
+    if _house_index is None:
+        return await load_house_index(db)
+
+    # 다른 워커가 인덱스를 다시 만들었는지 주기적으로 확인합니다.
+    # 파일 인덱스는 CURRENT만 읽고, 메모리 인덱스는 db의 카탈로그 버전과 비교합니다.
+    now = time.monotonic()
+    if now - _house_index_checked_at >= settings.HOUSE_INDEX_CHECK_INTERVAL:
+        _house_index_checked_at = now
+        if settings.HOUSE_INDEX_PATH:
+            reload_current_house_index()
+        elif _house_index.catalog_version != await get_catalog_version(db):
+            await refresh_house_index(db)
+    return _house_index
+
+
+class HouseRecommender:
+    def __init__(self, house_index: HouseIndex):
+        self.house_index = house_index
+        self.house_info = house_index.houses
+        self.tfidf_vectorizer = house_index.tfidf_vectorizer
+
+    def vectorize_categorical_data(self, persona):
+        return vectorize_categorical_data(persona)
+
+    def recommend(self, persona, top_n=3, exclude_ids=(), candidate_ids=None):
+        house_index = self.house_index
+
+        # 필터링된 매물 정보 사용 (이미 추천된 매물은 제외)
+        # candidate_ids가 주어지면 db에서 이미 걸러진 후보만 점수를 계산합니다.
+        if candidate_ids is None:
+            mask = house_index.eligible.copy()
+        else:
+            mask = np.zeros(len(house_index.houses), dtype=bool)
+            mask[[house_index.positions[house_id] for house_id in candidate_ids
+                  if house_id in house_index.positions]] = True
+        excluded_positions = [house_index.positions[house_id] for house_id in exclude_ids
+                              if house_id in house_index.positions]
+        mask[excluded_positions] = False
+        positions = np.flatnonzero(mask)
+
+        # 매물 이름별로 처음 나온 매물만 남깁니다.
+        _, first_positions = np.unique(house_index.apt_name_codes[positions], return_index=True)
+        positions = positions[np.sort(first_positions)]
+        if len(positions) == 0:
+            return []
+
+        # 집 벡터 = [페르소나 범주형 벡터, 집 텍스트 벡터, 방 개수 - 인원 수]
+        # 페르소나 벡터 = [페르소나 범주형 벡터, 페르소나 텍스트 벡터, 0]
+        # 두 벡터의 코사인 유사도를 모든 후보에 대해 한 번에 계산합니다.
+        # 집 벡터의 크기는 범주형 조합별로 미리 계산해 두었으므로 텍스트 유사도만 새로 계산합니다.
+        person_count, categorical_norm = persona_norm_key(persona)
+        persona_text_vector = self.tfidf_vectorizer.transform([persona['significant']])
+        persona_text_norm = float(persona_text_vector.multiply(persona_text_vector).sum())
+
+        text_similarity = (house_index.matrix @ persona_text_vector.toarray().ravel())[positions]
+        inverse_house_norm = house_index.get_inverse_house_norms(person_count, categorical_norm)[positions]
+        persona_norm = np.sqrt(categorical_norm + persona_text_norm)
+        similarity = (categorical_norm + text_similarity) * inverse_house_norm / persona_norm
+
+        # 상위 top_n개만 부분 정렬로 고르고, 동점일 때는 원래 순서를 유지합니다.
+        if len(similarity) > top_n:
+            threshold = np.partition(similarity, len(similarity) - top_n)[len(similarity) - top_n]
+            candidates = np.flatnonzero(similarity >= threshold)
+        else:
+            candidates = np.arange(len(similarity))
+        candidates = candidates[np.argsort(-similarity[candidates], kind='stable')][:top_n]
+
+        return [(similarity[i], house_index.houses[positions[i]]) for i in candidates]
+
+
+# 추천 점수 계산 프로세스에서 쓰는 인덱스. 디스크 인덱스를 mmap으로 열어 두고,
+# CURRENT가 가리키는 버전 디렉터리가 바뀌면 다시 엽니다.
+# 요청한 워커의 인덱스와 비교하지 않으므로, 워커가 뒤처져 있어도 요청마다 다시 열지 않습니다.
+_worker_house_index: Optional[HouseIndex] = None
+
+
+def init_recommend_worker(index_path: str) -> None:
+    global _worker_house_index
+    _worker_house_index = HouseIndex.load(index_path)
+
+
+def recommend_in_worker(index_path: str, persona: dict, top_n: int, candidate_ids) -> list:
+    global _worker_house_index
+    version = read_current_version(index_path)
+    if _worker_house_index is None or (version and _worker_house_index.artifact_version != version):
+        _worker_house_index = HouseIndex.load(index_path, version) or _worker_house_index
+    if _worker_house_index is None:
+        return []
+    return HouseRecommender(_worker_house_index).recommend(persona, top_n=top_n, candidate_ids=candidate_ids)
+
+
+class RecommendExecutor:
+    # 추천 점수 계산을 프로세스 풀에서 실행해서 이벤트 루프를 막지 않게 합니다.
+    # 작업자 수가 0이면 지금처럼 요청 처리 중에 바로 계산합니다.
+    def __init__(self, worker_count: int, queue_size: int):
+        self.worker_count = worker_count
+        self.queue_size = queue_size
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+
+    async def start(self) -> None:
+        if self.worker_count <= 0:
+            return
+        if not settings.HOUSE_INDEX_PATH:
+            print("HOUSE_INDEX_PATH가 없어 추천 점수 계산을 프로세스 풀 없이 실행합니다.")
+            return
+
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.worker_count,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_recommend_worker,
+            initargs=(settings.HOUSE_INDEX_PATH,),
+        )
+        # 작업자 프로세스를 미리 띄워 인덱스를 열어 둡니다.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, os.getpid) for _ in range(self.worker_count)])
+
+    async def stop(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    async def recommend(self, house_index: HouseIndex, persona: dict, candidate_ids, top_n: int = 3) -> list:
+        if self.pool is None:
+            return HouseRecommender(house_index).recommend(persona, top_n=top_n, candidate_ids=candidate_ids)
+
+        if self.pending >= self.queue_size:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="추천 요청이 많습니다. 잠시 후 다시 시도해주세요."
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, partial(
+                recommend_in_worker, settings.HOUSE_INDEX_PATH, persona, top_n, None if candidate_ids is None else list(candidate_ids)
+            ))
+        finally:
+            self.pending -= 1
+
+
+recommend_executor = RecommendExecutor(settings.RECOMMEND_WORKERS, settings.RECOMMEND_QUEUE_SIZE)
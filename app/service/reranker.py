@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from typing import Optional
+
+import aioredis
+import httpx
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import stage_timer, RERANK_COALESCED
+from app.core.stats import get_cache_stats
+from app.db.database import RELEASE_LOCK_SCRIPT
+
+rerank_cache_stats = get_cache_stats("rerank")
+
+
+class RerankerResponseError(Exception):
+    pass
+
+
+def parse_rerank_response(text: str) -> tuple:
+    # 모델 응답에서 rank, reason 리스트를 추출합니다.
+    try:
+        rank_section = text.split("rank:")[1]
+        reason_section = rank_section.split("reason:")[1]
+        rank_data = rank_section.split("reason:")[0]
+        rank_data = rank_data[rank_data.find("["):rank_data.find("]") + 1]
+        reason_section = reason_section[reason_section.find("["):reason_section.find("]") + 1]
+        rank_data = json.loads(rank_data.replace('\\"', '"'))
+        reason_data = json.loads(reason_section.replace('\\"', '"'))
+    except (IndexError, ValueError) as e:
+        raise RerankerResponseError(f"추천 모델 응답을 해석할 수 없습니다: {text[:200]}") from e
+    return rank_data, reason_data
+
+
+def filter_rank_names(rank_data, reason_data, candidates: list) -> tuple:
+    # 모델이 후보에 없는 이름을 만들어 내면 그 순위는 버립니다.
+    # 남는 순위가 없거나 rank와 reason이 짝이 맞지 않으면 잘못된 응답으로 봅니다.
+    if not isinstance(rank_data, list) or not isinstance(reason_data, list) or len(rank_data) != len(reason_data):
+        raise RerankerResponseError(f"추천 모델 응답의 rank와 reason이 맞지 않습니다: {rank_data!r}")
+    names = {candidate["aptName"] for candidate in candidates}
+    ranked = [(name, reason) for name, reason in zip(rank_data, reason_data) if isinstance(name, str) and name in names]
+    if not ranked:
+        raise RerankerResponseError(f"추천 모델 응답에 후보에 있는 집이 없습니다: {rank_data!r}")
+    if len(ranked) < len(rank_data):
+        print(f"추천 모델 응답에서 후보에 없는 집을 제외했습니다: {rank_data!r}")
+    return [name for name, _ in ranked], [reason for _, reason in ranked]
+
+
+def load_cached_rank(cached: Optional[str], candidates: list) -> Optional[tuple]:
+    # 검증하기 전에 저장된 캐시일 수 있으므로 읽을 때도 확인하고, 잘못된 값이면 없는 것으로 봅니다.
+    if cached is None:
+        return None
+    try:
+        rank_data, reason_data = json.loads(cached)
+        return filter_rank_names(rank_data, reason_data, candidates)
+    except (ValueError, RerankerResponseError):
+        return None
+
+
+def rerank_cache_key(persona: dict, candidates: list) -> str:
+    # 키 순서와 significant의 공백 차이로 같은 입력이 다른 키가 되지 않게 정규화합니다.
+    # 후보 순서는 모델 입력의 일부이므로 그대로 둡니다.
+    normalized = dict(persona, significant=" ".join(str(persona.get("significant", "")).split()))
+    payload = json.dumps({"persona": normalized, "candidates": candidates}, ensure_ascii=False, sort_keys=True)
+    return f"rerank:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+class CircuitBreaker:
+    # 연속 실패가 failure_threshold 이상이면 reset_timeout 동안 요청을 바로 거절하고,
+    # 이후 한 번의 시험 요청이 성공하면 다시 닫힙니다.
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failure_count = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failure_count += 1
+        if self.trial_in_flight or self.failure_count >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        # 시험 요청이 취소되어 결과가 없으면 다음 요청이 다시 시험할 수 있게 합니다.
+        self.trial_in_flight = False
+
+
+class RerankerClient:
+    def __init__(
+        self,
+        url: str,
+        connect_timeout: float,
+        read_timeout: float,
+        max_connections: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        circuit_breaker: CircuitBreaker,
+        cache_ttl: int,
+        lock_ttl: float,
+        lock_poll_interval: float,
+    ):
+        self.url = url
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_breaker = circuit_breaker
+        self.cache_ttl = cache_ttl
+        self.lock_ttl = lock_ttl
+        self.lock_poll_interval = lock_poll_interval
+        self.client: Optional[httpx.AsyncClient] = None
+        # 캐시 키 -> 이 프로세스에서 진행 중인 호출
+        self.in_flight = {}
+
+    @classmethod
+    def from_settings(cls) -> "RerankerClient":
+        return cls(
+            url=settings.HOUSE_REC_URL,
+            connect_timeout=settings.HOUSE_REC_CONNECT_TIMEOUT,
+            read_timeout=settings.HOUSE_REC_READ_TIMEOUT,
+            max_connections=settings.HOUSE_REC_MAX_CONNECTIONS,
+            max_retries=settings.HOUSE_REC_MAX_RETRIES,
+            backoff_base=settings.HOUSE_REC_BACKOFF_BASE,
+            backoff_max=settings.HOUSE_REC_BACKOFF_MAX,
+            circuit_breaker=CircuitBreaker(
+                settings.HOUSE_REC_BREAKER_THRESHOLD,
+                settings.HOUSE_REC_BREAKER_RESET,
+            ),
+            cache_ttl=settings.HOUSE_REC_CACHE_TTL,
+            lock_ttl=settings.HOUSE_REC_LOCK_TTL,
+            lock_poll_interval=settings.HOUSE_REC_LOCK_POLL_INTERVAL,
+        )
+
+    def get_client(self) -> httpx.AsyncClient:
+        # 프로세스마다 한 번만 만들어 keep-alive 연결을 재사용합니다.
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self.client
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def backoff(self, attempt: int) -> float:
+        # full jitter 지수 백오프
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def rank(self, persona: dict, candidates: list) -> tuple:
+        request_data = {
+            "user_info": json.dumps(persona, ensure_ascii=False),
+            "candidates": json.dumps(candidates, ensure_ascii=False)
+        }
+
+        for attempt in range(self.max_retries):
+            is_trial = self.circuit_breaker.state == "half-open"
+            if not self.circuit_breaker.allow():
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="추천 서버가 응답하지 않습니다. 잠시 후 다시 시도해주세요."
+                )
+
+            # 요청이 어떻게 끝나든(취소 포함) 시험 요청 표시가 남지 않게 합니다.
+            recorded = False
+            try:
+                response = await self.get_client().post(self.url, json=request_data)
+                if response.status_code >= 500:
+                    raise httpx.HTTPStatusError(
+                        f"추천 서버 오류 {response.status_code}", request=response.request, response=response
+                    )
+            except Exception as e:
+                # httpx 오류가 아닌 예외도 서버 호출 실패로 셉니다.
+                self.circuit_breaker.record_failure()
+                recorded = True
+                if not isinstance(e, httpx.HTTPError):
+                    raise
+                print(f"API 호출 실패 ({e!r})... {self.max_retries - attempt - 1}회 남음")
+            else:
+                # 서버는 응답했으므로 응답 형식이 잘못되어도 서버 장애로 보지 않습니다.
+                self.circuit_breaker.record_success()
+                recorded = True
+                try:
+                    with stage_timer("parse"):
+                        rank_data, reason_data = parse_rerank_response(response.text)
+                        return filter_rank_names(rank_data, reason_data, candidates)
+                except RerankerResponseError as e:
+                    print(f"{e}... {self.max_retries - attempt - 1}회 남음")
+            finally:
+                if not recorded and is_trial:
+                    self.circuit_breaker.release_trial()
+
+            if attempt + 1 < self.max_retries:
+                await asyncio.sleep(self.backoff(attempt))
+
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="추천 API 호출에 실패했습니다."
+        )
+
+    async def cached_rank(self, redis: aioredis.Redis, persona: dict, candidates: list) -> tuple:
+        # 같은 페르소나와 후보 목록이면 캐시된 rank/reason을 돌려주고,
+        # 동시에 들어온 같은 요청은 한 번의 모델 호출 결과를 함께 기다립니다.
+        key = rerank_cache_key(persona, candidates)
+        cached = load_cached_rank(await redis.get(key), candidates)
+        if cached is not None:
+            rerank_cache_stats.hit()
+            return cached
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            RERANK_COALESCED.labels("process").inc()
+        else:
+            rerank_cache_stats.miss()
+            task = asyncio.ensure_future(self.fill_cache(redis, key, persona, candidates))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # 먼저 요청한 쪽이 취소되어도 기다리는 다른 요청을 위해 호출은 계속 진행합니다.
+        return await asyncio.shield(task)
+
+    async def fill_cache(self, redis: aioredis.Redis, key: str, persona: dict, candidates: list) -> tuple:
+        # 다른 워커가 같은 키를 호출 중이면 결과가 저장되거나 잠금이 풀릴 때까지 기다립니다.
+        # 잠금에는 TTL이 있어서 잡은 워커가 죽어도 다음 요청이 이어받습니다.
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        while not await redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+            await asyncio.sleep(self.lock_poll_interval)
+            cached = load_cached_rank(await redis.get(key), candidates)
+            if cached is not None:
+                RERANK_COALESCED.labels("redis").inc()
+                return cached
+
+        try:
+            # 잠금을 기다리는 사이 앞선 호출이 결과를 저장했을 수 있습니다.
+            cached = load_cached_rank(await redis.get(key), candidates)
+            if cached is not None:
+                RERANK_COALESCED.labels("redis").inc()
+                return cached
+
+            rank_data, reason_data = await self.rank(persona, candidates)
+            await redis.set(key, json.dumps([rank_data, reason_data], ensure_ascii=False), ex=self.cache_ttl)
+            return rank_data, reason_data
+        finally:
+            await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+
+reranker_client = RerankerClient.from_settings()
+
+
+def get_reranker_client() -> RerankerClient:
+    return reranker_client
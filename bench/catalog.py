@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import random
+
+# 실제 apartment_info.jsonl과 같은 필드와 값 분포를 갖는 가상 매물 카탈로그를 만듭니다.
+
+APT_PREFIXES = [
+    "한빛", "금강", "무궁화", "엑스포", "샘머리", "목련", "느티마을", "햇님", "가람", "둔산",
+    "푸른", "한마루", "청솔", "다사랑", "은하수", "보라", "송림", "하늘채", "꿈에그린", "수정",
+]
+APT_SUFFIXES = ["아파트", "타운", "마을", "맨션", "빌리지", "파크", "센트럴", "스위첸"]
+DISTRICTS = {
+    "서구": ["가수원동", "둔산동", "탄방동", "월평동", "관저동", "도마동"],
+    "대덕구": ["법동", "송촌동", "비래동", "대화동", "중리동", "오정동"],
+    "동구": ["가양동", "판암동", "가오동", "용운동", "천동", "대동"],
+    "유성구": ["계산동", "노은동", "지족동", "전민동", "봉명동", "어은동"],
+    "중구": ["태평동", "문화동", "유천동", "산성동", "목동", "선화동"],
+}
+AGE_TAGS = ["2년이내", "4년이내", "10년이내", "15년이내", "25년이내", "25년이상"]
+ROOM_TAGS = ["방한개", "방두개", "방세개", "방세개", "방세개", "방네개이상"]
+BATH_TAGS = ["화장실한개", "화장실두개", "화장실두개", "화장실네개이상"]
+FLOOR_TAGS = ["1층", "저층", "중층", "고층", "탑층"]
+EXTRA_TAGS = [
+    "대단지", "소형평수", "대형평수", "융자금없는", "융자금적은", "급매", "역세권", "올수리",
+    "세대당1대", "세대당 1.5대이상", "관리비20만원이하", "관리비10만원이하", "보일러교체",
+    "필로티", "욕실수리", "테라스", "마당", "주차가능", "확장형", "주방교체", "붙박이장",
+]
+FEATURE_PHRASES = [
+    "전망좋고 햇빛이 잘 들어옵니다", "기본집입니다 입주협의", "지역난방으로 난방비 저렴합니다",
+    "욕실 씽크대 신발장 수리된 집", "하루종일 밝고 환한 집", "난방비 보조로 관리비 저렴한 아파트",
+    "전세자금대출가능", "올수리된 물건 입니다", "햇볕이 잘들고 살기 좋은 집입니다", "급매 입주 가능",
+    "역에서 도보 5분 거리", "초등학교 바로 앞 학세권", "조용하고 깨끗한 단지", "주차 여유 있음",
+    "남향 로얄층", "공원 산책로 인접", "대형마트 병원 가까움", "반려동물 가능",
+]
+DETAIL_PHRASES = [
+    "주변에 공원이 가깝고 경찰서, 은행, 동사무소, 학교, 병원, 약국, 어린이집이 있습니다.",
+    "입주협의가능합니다. 궁금한사항은 언제든지 전화주세요.",
+    "버스 정류장이 가까워 대중교통 이용이 편리합니다.",
+    "단지 내 놀이터와 커뮤니티 시설이 잘 갖춰져 있습니다.",
+    "최근 도배 장판 새로 했습니다. 바로 입주 가능합니다.",
+    "시장과 상가가 가까워 생활이 편리합니다.",
+    "조용한 주거 환경으로 학생과 직장인 모두 만족하는 집입니다.",
+]
+SIGNIFICANTS = [
+    "역 가까운 조용한 곳", "주차 가능한 넓은 집", "학교 가까운 집", "관리비 저렴한 곳",
+    "햇빛 잘 드는 남향", "올수리된 깨끗한 집", "공원 근처 산책하기 좋은 곳", "반려동물 가능",
+]
+
+
+def random_persona(rng: random.Random) -> dict:
+    return {
+        "person_count": rng.choice(["1명", "2명", "3명", "4명 이상"]),
+        "period": rng.choice(["1주", "2주", "3주", "4주 이상"]),
+        "identity": rng.choice(["학생", "직장인", "기타"]),
+        "car": rng.choice(["자차", "대중교통"]),
+        "child": rng.choice(["아이 있음", "아이 없음"]),
+        "significant": rng.choice(SIGNIFICANTS),
+    }
+
+
+def generate_house(rng: random.Random, house_id: int, complex_count: int) -> dict:
+    gu = rng.choice(list(DISTRICTS))
+    dong = rng.choice(DISTRICTS[gu])
+    complex_id = rng.randrange(complex_count)
+    apt_name = f"{APT_PREFIXES[complex_id % len(APT_PREFIXES)]}{complex_id // len(APT_PREFIXES) + 1}" \
+               f"{APT_SUFFIXES[complex_id % len(APT_SUFFIXES)]}"
+    tags = [rng.choice(AGE_TAGS), rng.choice(FLOOR_TAGS), rng.choice(ROOM_TAGS), rng.choice(BATH_TAGS)]
+    tags += rng.sample(EXTRA_TAGS, rng.randint(0, 3))
+    detail = "없음" if rng.random() < 0.3 else \
+        f"{apt_name}\n{dong}에 위치한 {rng.randint(50, 2000)}세대 {apt_name}입니다~\n" + \
+        " ".join(rng.sample(DETAIL_PHRASES, rng.randint(1, 3)))
+    parking = "0" if rng.random() < 0.2 else f"{rng.uniform(0.1, 2.5):.2f}".rstrip("0").rstrip(".")
+
+    return {
+        "aptName": apt_name,
+        "tradeBuildingTypeCode": "APT" if rng.random() < 0.98 else "OFCT",
+        "aptHeatMethodTypeName": rng.choice(["개별난방", "개별난방", "개별난방", "지역난방", "중앙난방"]),
+        "aptHeatFuelTypeName": rng.choice(["도시가스", "도시가스", "도시가스", "열병합"]),
+        "aptParkingCountPerHousehold": parking,
+        "aptHouseholdCount": str(rng.randint(20, 3000)),
+        "exposureAddress": f"대전시 {gu} {dong}",
+        "monthlyManagementCost": rng.choice([0, rng.randint(50000, 300000)]),
+        "articleFeatureDescription": " ".join(rng.sample(FEATURE_PHRASES, rng.randint(1, 3))),
+        "detailDescription": detail,
+        "floorLayerName": "단층",
+        "principalUse": rng.choice(["공동주택", "공동주택", "공동주택", "없음"]),
+        "tagList": tags,
+        "schoolName": f"대전{dong[:-1]}초등학교",
+        "organizationType": "공립" if rng.random() < 0.96 else "혁신",
+        "establishmentYmd": f"{rng.randint(1970, 2020)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+        "walkTime": rng.randint(1, 30),
+        "studentCountPerTeacher": round(rng.uniform(5, 20), 1),
+        "id": house_id,
+        "url": f"https://new.land.naver.com/complexes/{100000 + complex_id}?a=APT&e=RETAIL&article={house_id}",
+        "image_url": f"https://landthumb-phinf.pstatic.net/bench/{complex_id}.JPG",
+    }
+
+
+def generate_catalog(rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    # 같은 단지 이름의 매물이 여러 개 나오도록 단지 수를 매물 수보다 적게 둡니다.
+    complex_count = max(1, rows // 3)
+    for house_id in range(rows):
+        yield generate_house(rng, house_id, complex_count)
+
+
+def write_catalog(path: str, rows: int, seed: int = 0) -> None:
+    with open(path, "w") as f:
+        for house in generate_catalog(rows, seed):
+            f.write(json.dumps(house, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가상 apartment_info.jsonl 카탈로그 생성")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_output/apartment_info.jsonl")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    write_catalog(args.out, args.rows, args.seed)
+    print(f"{args.rows}개 매물 생성: {args.out}")
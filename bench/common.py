@@ -0,0 +1,63 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+def summarize(latencies: list, elapsed: float = None, errors: int = 0) -> dict:
+    # 지연 시간(초) 목록을 ms 단위 통계로 요약합니다.
+    values = np.array(latencies, dtype=np.float64) * 1000
+    result = {
+        "count": len(latencies),
+        "errors": errors,
+        "mean_ms": float(values.mean()) if len(values) else None,
+        "p50_ms": float(np.percentile(values, 50)) if len(values) else None,
+        "p95_ms": float(np.percentile(values, 95)) if len(values) else None,
+        "p99_ms": float(np.percentile(values, 99)) if len(values) else None,
+        "max_ms": float(values.max()) if len(values) else None,
+    }
+    if elapsed:
+        result["rps"] = len(latencies) / elapsed
+    return result
+
+
+def measure(func, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(path: str, suite: str, params: dict, results: dict) -> None:
+    # 실행 환경과 함께 결과를 저장해서 나중에 compare로 비교할 수 있게 합니다.
+    output = {
+        "suite": suite,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {path}")
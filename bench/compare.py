@@ -0,0 +1,40 @@
+import argparse
+import json
+
+# 두 벤치마크 결과 파일을 비교해서 항목별 p50/p95 변화율을 출력합니다.
+
+METRICS = ["p50_ms", "p95_ms"]
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(base: dict, head: dict) -> list:
+    rows = []
+    for name, result in head["results"].items():
+        base_result = base["results"].get(name)
+        if base_result is None:
+            continue
+        row = [name]
+        for metric in METRICS:
+            before, after = base_result[metric], result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            row.append(f"{before:.2f} -> {after:.2f} ({change:+.1f}%)")
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    print(f"{base['git_revision']} -> {head['git_revision']}")
+    rows = [["benchmark"] + METRICS] + compare(base, head)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
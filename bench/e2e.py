@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import socket
+import tempfile
+import time
+
+from bench.catalog import random_persona, write_catalog
+from bench.common import summarize, write_results
+from bench.stub_reranker import serve_in_background
+
+# SQLite + 프로세스 내 Redis + 스텁 추천 서버로 앱 전체를 띄워 엔드포인트 지연 시간을 측정합니다.
+# 앱 설정은 import 시점에 읽히므로 환경 변수를 먼저 정한 뒤 main을 import합니다.
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def configure(args, workdir: str) -> None:
+    catalog_path = os.path.join(workdir, "apartment_info.jsonl")
+    write_catalog(catalog_path, args.rows, args.seed)
+    port = free_port()
+    serve_in_background(port, args.reranker_delay)
+
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["REDIS_BACKEND"] = "memory"
+    os.environ["DB_CREATE_SCHEMA"] = "true"
+    os.environ["HOUSE_DATA_PATH"] = catalog_path
+    os.environ["HOUSE_INDEX_PATH"] = ""
+    os.environ["HOUSE_REC_URL"] = f"http://127.0.0.1:{port}/"
+    # 파이프라인 지연을 재는 것이므로 사용자별 속도 제한은 끕니다.
+    os.environ["CHAT_RATE_LIMIT"] = "0"
+
+
+async def run_endpoint(name: str, request, iterations: int, concurrency: int) -> dict:
+    # request(i)는 성공 여부를 돌려주는 코루틴입니다.
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            ok = await request(i)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(iterations)])
+    result = summarize(latencies, time.perf_counter() - start, errors)
+    print(f"  {name}: p50 {result['p50_ms']:.2f}ms p95 {result['p95_ms']:.2f}ms "
+          f"{result['rps']:.1f} req/s (실패 {errors})")
+    return result
+
+
+async def run(args) -> dict:
+    import httpx
+    from main import app
+
+    rng = random.Random(args.seed)
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+            # warmup이 끝나 테이블과 인덱스가 준비될 때까지 기다립니다.
+            while (await client.get("/system/ready")).status_code != 200:
+                await asyncio.sleep(0.05)
+
+            async def login(i: int) -> httpx.Response:
+                return await client.post("/auth/login", json={"nickname": f"bench{i % args.users}", "password": "bench"})
+
+            headers = []
+            for i in range(args.users):
+                response = await login(i)
+                headers.append({"Authorization": f"Bearer {response.json()['data']['access_token']}"})
+
+            start = time.perf_counter()
+            response = await client.get("/house/initailize", headers=headers[0])
+            results["house_initailize"] = summarize([time.perf_counter() - start], errors=int(response.status_code != 200))
+            print(f"  house_initailize: {results['house_initailize']['p50_ms']:.0f}ms {response.json()['data']}")
+
+            async def auth_login(i: int) -> bool:
+                return (await login(i)).status_code == 200
+
+            async def house_list_page(i: int) -> bool:
+                page = i // args.users % 5 + 1
+                return (await client.get(f"/house/list/{page}", headers=headers[i % args.users])).status_code == 200
+
+            cursors = {}
+
+            async def house_list_cursor(i: int) -> bool:
+                user = i % args.users
+                params = {"cursor": cursors[user]} if cursors.get(user) else {}
+                response = await client.get("/house/list", params=params, headers=headers[user])
+                cursors[user] = response.json()["data"].get("next_cursor") if response.status_code == 200 else None
+                return response.status_code == 200
+
+            async def house_detail(i: int) -> bool:
+                house_id = rng.randint(1, args.rows)
+                response = await client.get(f"/house/detail/{house_id}", headers=headers[i % args.users])
+                return response.status_code in (200, 404)
+
+            async def house_detail_batch(i: int) -> bool:
+                params = [("ids", rng.randint(1, args.rows)) for _ in range(10)]
+                response = await client.get("/house/detail", params=params, headers=headers[i % args.users])
+                return response.status_code == 200
+
+            async def chat_sync(i: int) -> bool:
+                response = await client.post("/chat/sync", json=random_persona(rng), headers=headers[i % args.users])
+                return response.status_code == 200
+
+            async def chat_job(i: int) -> bool:
+                user_headers = headers[i % args.users]
+                response = await client.post("/chat", json=random_persona(rng), headers=user_headers)
+                if response.status_code != 200:
+                    return False
+                job_id = response.json()["data"]["job_id"]
+                while True:
+                    await asyncio.sleep(0.01)
+                    job = (await client.get(f"/chat/{job_id}", headers=user_headers)).json()["data"]
+                    if job["status"] in ("done", "failed"):
+                        return job["status"] == "done"
+
+            benchmarks = {
+                "auth_login": auth_login,
+                "house_list_page": house_list_page,
+                "house_list_cursor": house_list_cursor,
+                "house_detail": house_detail,
+                "house_detail_batch": house_detail_batch,
+                "chat_sync": chat_sync,
+                "chat_job": chat_job,
+            }
+            selected = args.only.split(",") if args.only else list(benchmarks)
+            for name in selected:
+                iterations = args.chat_iterations if name.startswith("chat") else args.iterations
+                results[name] = await run_endpoint(name, benchmarks[name], iterations, args.concurrency)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="엔드포인트 end-to-end 벤치마크")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--chat-iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--reranker-delay", type=float, default=0.0)
+    parser.add_argument("--only", default="", help="쉼표로 구분한 벤치마크 이름")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_output/e2e.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure(args, workdir)
+        results = asyncio.run(run(args))
+    write_results(args.out, "e2e", vars(args), results)
@@ -0,0 +1,74 @@
+import argparse
+import random
+import tempfile
+import time
+
+from bench.catalog import generate_catalog, generate_house, random_persona
+from bench.common import measure, summarize, write_results
+from app.service.house import to_house_row
+from app.service.recommender import HouseIndex, HouseRecommender
+
+
+def load_houses(rows: int, seed: int) -> list:
+    houses = []
+    for house in generate_catalog(rows, seed):
+        row = to_house_row(house)
+        row["id"] = house["id"] + 1
+        houses.append(row)
+    return houses
+
+
+def run(rows: int, repeat: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    houses = load_houses(rows, seed)
+    results = {}
+
+    build_repeat = max(1, min(repeat, 20000 * 5 // rows))
+    results["index_build"] = summarize(measure(lambda: HouseIndex.build(houses), build_repeat))
+    house_index = HouseIndex.build(houses)
+
+    # 디스크 인덱스를 mmap으로 여는 시간 (워커 시작 시간)
+    with tempfile.TemporaryDirectory() as index_path:
+        house_index.save(index_path)
+        results["index_load"] = summarize(measure(lambda: HouseIndex.load(index_path), repeat))
+
+    results["recommender_init"] = summarize(measure(lambda: HouseRecommender(house_index), repeat))
+    recommender = HouseRecommender(house_index)
+
+    ids = [house["id"] for house in houses]
+    latencies = []
+    for _ in range(repeat):
+        persona = random_persona(rng)
+        exclude_ids = set(rng.sample(ids, min(30, len(ids))))
+        start = time.perf_counter()
+        recommender.recommend(persona, exclude_ids=exclude_ids)
+        latencies.append(time.perf_counter() - start)
+    results["recommend"] = summarize(latencies)
+
+    # 새 매물 추가는 인덱스를 바꾸므로 전체의 REFIT_RATIO를 넘지 않는 횟수만 측정합니다.
+    add_repeat = max(1, min(repeat, rows // 20))
+    new_houses = []
+    for i in range(add_repeat):
+        row = to_house_row(generate_house(rng, rows + i, max(1, rows // 3)))
+        row["id"] = rows + i + 1
+        new_houses.append(row)
+    new_houses = iter(new_houses)
+    results["index_add"] = summarize(measure(lambda: house_index.add(next(new_houses), house_index.catalog_version), add_repeat))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 인덱스/추천 알고리즘 마이크로 벤치마크")
+    parser.add_argument("--rows", default="1000,10000,100000", help="쉼표로 구분한 카탈로그 크기")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_output/micro.json")
+    args = parser.parse_args()
+
+    results = {}
+    for rows in [int(rows) for rows in args.rows.split(",")]:
+        print(f"카탈로그 {rows}개 측정 중...")
+        for name, result in run(rows, args.repeat, args.seed).items():
+            results[f"{name}[{rows}]"] = result
+            print(f"  {name}: p50 {result['p50_ms']:.2f}ms p95 {result['p95_ms']:.2f}ms")
+    write_results(args.out, "micro", vars(args), results)
@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+# 추천 LLM 서버 대신 쓰는 스텁 서버입니다. 후보 순서를 그대로 순위로 돌려주고,
+# 실제 모델과 같은 "rank: [...] reason: [...]" 형식으로 응답합니다.
+
+
+def create_app(delay: float = 0.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/")
+    async def rank(request: Request):
+        body = await request.json()
+        candidates = json.loads(body["candidates"])
+        if delay:
+            await asyncio.sleep(delay)
+        rank_data = [candidate["aptName"] for candidate in candidates]
+        reason_data = [f"{candidate['aptName']}은(는) 조건에 잘 맞는 집입니다." for candidate in candidates]
+        return PlainTextResponse(
+            f"rank: {json.dumps(rank_data, ensure_ascii=False)}\n"
+            f"reason: {json.dumps(reason_data, ensure_ascii=False)}"
+        )
+
+    return app
+
+
+def serve_in_background(port: int, delay: float = 0.0) -> uvicorn.Server:
+    # 벤치마크 프로세스 안에서 별도 스레드로 스텁 서버를 띄웁니다.
+    server = uvicorn.Server(uvicorn.Config(create_app(delay), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 모델 스텁 서버")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.0, help="응답 전 대기 시간(초)")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.delay), host="127.0.0.1", port=args.port)
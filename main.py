@@ -1,16 +1,92 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.router import auth, chat, house
+from app.core.health import readiness
+from app.core.metrics import MetricsMiddleware
+from app.db.database import get_SessionLocal, create_schema, ping_db, dispose_engine, create_redis_client, close_redis_client
+from app.router import auth, chat, house, system
+from app.service.recommender import load_house_index, recommend_executor, PERSON_COUNTS, PERIODS, IDENTITIES, CARS, CHILDREN
+from app.service.chat_job import chat_job_worker
+from app.service.like import like_flusher
+from app.service.reranker import reranker_client
+
+WARMUP_PERSONA = {
+    "person_count": PERSON_COUNTS[0],
+    "period": PERIODS[0],
+    "identity": IDENTITIES[0],
+    "car": CARS[0],
+    "child": CHILDREN[0],
+    "significant": "",
+}
+
+
+async def warmup() -> None:
+    # db나 Redis가 아직 뜨지 않았으면 준비될 때까지 다시 시도합니다.
+    # 그동안 워커는 살아 있고(/system/live) 준비되지 않은 상태(/system/ready 503)로 남습니다.
+    while True:
+        try:
+            if settings.DB_CREATE_SCHEMA:
+                await create_schema()
+            await ping_db()
+            readiness.mark("db")
+
+            await create_redis_client().ping()
+            readiness.mark("redis")
+
+            # 추천 인덱스는 프로세스 시작 시 한 번만 만듭니다.
+            async with get_SessionLocal()() as db:
+                house_index = await load_house_index(db)
+            readiness.mark("house_index")
+
+            if recommend_executor.pool is None:
+                await recommend_executor.start()
+            # 첫 추천 요청이 느리지 않도록 점수 계산을 한 번 실행해 둡니다.
+            if house_index is not None:
+                await recommend_executor.recommend(house_index, WARMUP_PERSONA, None)
+            readiness.mark("recommender")
+            break
+        except Exception as e:
+            readiness.fail(e)
+            print(f"워커 준비 실패 ({e!r}), {settings.WARMUP_RETRY_INTERVAL}초 뒤 다시 시도합니다.")
+            await asyncio.sleep(settings.WARMUP_RETRY_INTERVAL)
+    readiness.set_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 요청은 바로 받기 시작하고, 무거운 준비 작업은 warmup에서 백그라운드로 진행합니다.
+    create_redis_client()
+    await chat_job_worker.start()
+    await like_flusher.start()
+    warmup_task = asyncio.create_task(warmup())
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await chat_job_worker.stop()
+        await like_flusher.stop()
+        await recommend_executor.stop()
+        await reranker_client.close()
+        await close_redis_client()
+        await dispose_engine()
 
 
 app = FastAPI(
     root_path=settings.ROOT_PATH,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+
 app.include_router(auth.router)
 app.include_router(chat.router)
 app.include_router(house.router)
+app.include_router(system.router)
 
 
 app.add_middleware(
@@ -19,4 +95,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+# 앱 설정은 import 시점에 읽히므로 app을 import하기 전에 환경 변수를 정합니다.
+# db는 임시 SQLite 파일, Redis는 프로세스 내 MemoryRedis를 사용합니다.
+TEST_DIR = tempfile.mkdtemp(prefix="a7-test-")
+os.environ.update({
+    "SERVER_TYPE": "test",
+    "ROOT_PATH": "",
+    "DB_URL": "unused",
+    "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(TEST_DIR, 'test.db')}",
+    "REDIS_URL": "localhost",
+    "REDIS_BACKEND": "memory",
+    "HOUSE_REC_URL": "http://reranker.test/",
+    "HOUSE_INDEX_PATH": "",
+})
+
+import datetime
+import random
+
+import httpx
+import jwt
+import pytest
+from sqlalchemy import event
+
+from app.db.database import engine, get_SessionLocal, create_redis_client, token_cache, user_cache
+from app.db.models import get_Base, User, House
+from app.service.house import to_house_row
+from bench.catalog import generate_house
+
+
+# 운영 db(MySQL InnoDB)처럼 외래 키를 검사합니다.
+@event.listens_for(engine.sync_engine, "connect")
+def enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture
+async def redis():
+    client = create_redis_client()
+    await client.flushall()
+    yield client
+
+
+@pytest.fixture
+async def db():
+    # 테스트마다 빈 테이블에서 시작합니다.
+    async with engine.begin() as conn:
+        await conn.run_sync(get_Base().metadata.drop_all)
+        await conn.run_sync(get_Base().metadata.create_all)
+    async with get_SessionLocal()() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(db):
+    user = User(nickname="tester", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@pytest.fixture
+async def house_ids(db):
+    # id가 1부터 5인 집을 만듭니다.
+    rng = random.Random(0)
+    rows = []
+    for source_id in range(5):
+        row = to_house_row(generate_house(rng, source_id, 3))
+        row["source_id"] = source_id
+        rows.append(House(**row))
+    db.add_all(rows)
+    await db.commit()
+    return [house.id for house in rows]
+
+
+@pytest.fixture
+async def client(user, redis):
+    # lifespan(워커, warmup)은 실행하지 않고 라우터만 호출합니다.
+    from main import app
+
+    token_cache.clear()
+    user_cache.clear()
+    token = jwt.encode(
+        {"sub": user.nickname, "exp": datetime.datetime.utcnow() + datetime.timedelta(days=1)}, "sarabwayu", algorithm="HS256"
+    )
+    async with httpx.AsyncClient(app=app, base_url="http://test", headers={"Authorization": f"Bearer {token}"}) as client:
+        yield client
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.request import Chat
+from app.service.admission import ChatAdmission, admit_chat, rate_key, CHAT_SLOTS_KEY
+
+CHAT = Chat(person_count="2명", period="1주", identity="학생", car="자차", child="아이 없음", significant="")
+
+
+def make_admission(**options) -> ChatAdmission:
+    return ChatAdmission(**{
+        "max_concurrency": 1,
+        "rate": 5,
+        "burst": 2,
+        "queue_size": 1,
+        "wait_timeout": 0.1,
+        "job_wait_timeout": 1,
+        "poll_interval": 0.01,
+        "slot_ttl": 5,
+        "retry_after": 3,
+        **options,
+    })
+
+
+async def test_token_bucket_allows_burst_then_refills(redis):
+    admission = make_admission()
+    await admission.check_rate(redis, 1)
+    await admission.check_rate(redis, 1)
+
+    with pytest.raises(HTTPException) as error:
+        await admission.check_rate(redis, 1)
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) >= 1
+
+    # 다른 사용자의 버킷은 따로 셉니다.
+    await admission.check_rate(redis, 2)
+
+    await asyncio.sleep(0.25)
+    await admission.check_rate(redis, 1)
+    assert admission.shed_counts == {"rate_limit": 1}
+
+
+async def test_slot_waits_then_sheds(redis):
+    admission = make_admission()
+    token = await admission.acquire(redis)
+
+    waiting = asyncio.create_task(admission.acquire(redis))
+    await asyncio.sleep(0.01)
+    # 기다리는 자리(queue_size)가 차 있으면 바로 거절합니다.
+    with pytest.raises(HTTPException):
+        await admission.acquire(redis)
+    # 기다리던 요청은 wait_timeout이 지나면 거절됩니다.
+    with pytest.raises(HTTPException):
+        await waiting
+    assert admission.shed_counts == {"queue_full": 1, "timeout": 1}
+
+    await admission.release(redis, token)
+    await admission.release(redis, await admission.acquire(redis))
+    assert await redis.hlen(CHAT_SLOTS_KEY) == 0
+
+
+async def test_accepted_jobs_wait_without_shedding(redis):
+    admission = make_admission()
+    token = await admission.acquire(redis)
+
+    async def job():
+        async with admission.slot(redis, shed=False):
+            return "done"
+
+    task = asyncio.create_task(job())
+    await asyncio.sleep(0.3)
+    # wait_timeout이 지나도 거절하지 않고 기다립니다.
+    assert not task.done() and admission.job_waiting == 1
+
+    await admission.release(redis, token)
+    assert await task == "done"
+    assert admission.shed_counts == {}
+
+
+async def test_accepted_jobs_fail_after_job_wait_timeout(redis):
+    admission = make_admission(job_wait_timeout=0.2)
+    token = await admission.acquire(redis)
+
+    with pytest.raises(HTTPException) as error:
+        await admission.acquire(redis, shed=False)
+    assert error.value.status_code == 503
+    assert admission.shed_counts == {"job_timeout": 1} and admission.job_waiting == 0
+    await admission.release(redis, token)
+
+
+async def test_slot_is_renewed_while_held(redis):
+    admission = make_admission(slot_ttl=0.3)
+
+    async with admission.slot(redis):
+        # slot_ttl보다 오래 실행해도 슬롯이 남아 있어 동시 실행 수를 넘지 않습니다.
+        await asyncio.sleep(0.7)
+        assert await redis.hlen(CHAT_SLOTS_KEY) == 1
+        with pytest.raises(HTTPException):
+            await admission.acquire(redis)
+    assert await redis.hlen(CHAT_SLOTS_KEY) == 0
+
+
+async def test_admit_chat_validates_before_taking_capacity(redis, user):
+    with pytest.raises(HTTPException) as error:
+        await admit_chat(CHAT.copy(update={"period": "100주"}), user, redis).__anext__()
+    assert error.value.status_code == 400
+    assert not await redis.exists(rate_key(user.id), CHAT_SLOTS_KEY)
@@ -0,0 +1,99 @@
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlalchemy import select, update
+
+from app.db.database import get_current_user, invalidate_user_cache, token_cache, user_cache
+from app.db.models import User
+from app.schemas.request import Auth
+from app.service import auth
+from app.service.auth import AuthService
+
+
+def make_context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto",
+        bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds,
+    )
+
+
+@pytest.fixture
+async def alice(db, monkeypatch):
+    monkeypatch.setattr(auth, "pwd_context", make_context(5))
+    user = User(nickname="alice", hashed_password=make_context(4).hash("pw"))
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def stored_hash(db, nickname: str) -> str:
+    return await db.scalar(select(User.hashed_password).filter(User.nickname == nickname))
+
+
+async def test_login_rehashes_when_rounds_change(db, redis, alice, monkeypatch):
+    async def no_hash(password):
+        raise AssertionError("로그인에서는 새로 해싱하지 않습니다.")
+
+    monkeypatch.setattr(auth, "hash_password", no_hash)
+    old_hash = await stored_hash(db, "alice")
+
+    token = await AuthService(db, redis).login(Auth(nickname="alice", password="pw"))
+    assert not token.is_signup
+    new_hash = await stored_hash(db, "alice")
+    assert new_hash != old_hash and new_hash.startswith("$2b$05$")
+
+    # 같은 cost로 저장된 해시는 다시 해싱하지 않습니다.
+    await AuthService(db, redis).login(Auth(nickname="alice", password="pw"))
+    assert await stored_hash(db, "alice") == new_hash
+
+
+async def test_wrong_password_is_rejected(db, redis, alice):
+    old_hash = await stored_hash(db, "alice")
+    with pytest.raises(HTTPException) as error:
+        await AuthService(db, redis).login(Auth(nickname="alice", password="wrong"))
+    assert error.value.status_code == 401
+    assert await stored_hash(db, "alice") == old_hash
+
+
+async def test_signup_hashes_with_configured_rounds(db, redis, monkeypatch):
+    monkeypatch.setattr(auth, "pwd_context", make_context(5))
+    token = await AuthService(db, redis).login(Auth(nickname="bob", password="pw"))
+    assert token.is_signup
+    assert (await stored_hash(db, "bob")).startswith("$2b$05$")
+
+
+async def current_user(db, redis, nickname: str) -> User:
+    token = await AuthService(db, redis).create_token(nickname)
+    return await get_current_user(f"Bearer {token}", redis)
+
+
+async def test_user_cache_is_invalidated(db, redis, user):
+    token_cache.clear()
+    user_cache.clear()
+    assert (await current_user(db, redis, user.nickname)).phone is None
+
+    await db.execute(update(User).filter(User.id == user.id).values(phone="010-0000-0000"))
+    await db.commit()
+    # 프로세스 캐시와 Redis 캐시에서 읽으므로 db를 바꿔도 그대로입니다.
+    assert (await current_user(db, redis, user.nickname)).phone is None
+    user_cache.clear()
+    assert (await current_user(db, redis, user.nickname)).phone is None
+
+    await invalidate_user_cache(redis, user.nickname)
+    assert (await current_user(db, redis, user.nickname)).phone == "010-0000-0000"
+
+
+async def test_rehash_invalidates_cached_user(db, redis, alice):
+    user_cache.clear()
+    await current_user(db, redis, "alice")
+    assert await redis.exists("user:alice")
+
+    await AuthService(db, redis).login(Auth(nickname="alice", password="pw"))
+    assert not await redis.exists("user:alice")
+    assert user_cache.get("alice") is None
+
+
+async def test_unknown_user_is_unauthorized(db, redis):
+    with pytest.raises(HTTPException) as error:
+        await current_user(db, redis, "nobody")
+    assert error.value.status_code == 401
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.schemas.request import Chat
+from app.service import chat_job
+from app.service.admission import chat_admission
+from app.service.chat_job import ChatJobService, ChatJobWorker, user_jobs_key, job_key, JOB_DONE, JOB_FAILED
+
+CHAT = Chat(person_count="2명", period="1주", identity="학생", car="자차", child="아이 없음", significant="역 근처")
+
+
+@pytest.fixture
+async def worker(redis, monkeypatch):
+    # 작업자 없이 큐만 있는 워커로 바꿔서, 접수된 작업이 실행되지 않고 남아 있게 합니다.
+    monkeypatch.setattr(settings, "CHAT_JOB_MAX_PER_USER", 2)
+    monkeypatch.setattr(chat_admission, "rate", 0)
+    worker = ChatJobWorker(worker_count=0, queue_size=10)
+    await worker.start()
+    monkeypatch.setattr(chat_job, "chat_job_worker", worker)
+    return worker
+
+
+async def test_submit_limits_active_jobs_per_user(redis, user, worker):
+    service = ChatJobService(user, redis)
+    first = await service.submit(CHAT)
+    await service.submit(CHAT)
+
+    with pytest.raises(HTTPException) as error:
+        await service.submit(CHAT)
+    assert error.value.status_code == 429
+    assert await redis.hlen(user_jobs_key(user.id)) == 2
+
+    # 끝난 작업은 제한에서 빠집니다.
+    await worker.finish(first["job_id"], {"status": JOB_DONE, "user_id": user.id, "result": {}})
+    await service.submit(CHAT)
+    assert (await service.get(first["job_id"]))["status"] == JOB_DONE
+
+
+async def test_leaked_jobs_expire(redis, user, worker, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_JOB_ACTIVE_TTL", 1)
+    service = ChatJobService(user, redis)
+    await service.submit(CHAT)
+    await service.submit(CHAT)
+
+    # 거절된 요청은 만료 시각을 늘리지 않으므로, 정리되지 못한 작업도 TTL이 지나면 빠집니다.
+    await asyncio.sleep(0.6)
+    with pytest.raises(HTTPException):
+        await service.submit(CHAT)
+    await asyncio.sleep(0.5)
+    await service.submit(CHAT)
+    assert await redis.hlen(user_jobs_key(user.id)) == 1
+
+
+async def test_running_job_keeps_its_slot(redis, user, worker, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_JOB_ACTIVE_TTL", 0.3)
+    monkeypatch.setattr(settings, "CHAT_JOB_MAX_PER_USER", 1)
+
+    class SlowChatService:
+        def __init__(self, *args):
+            pass
+
+        async def chat(self, chat_data):
+            await asyncio.sleep(0.7)
+            return {"houses": []}
+
+    monkeypatch.setattr(chat_job, "ChatService", SlowChatService)
+    service = ChatJobService(user, redis)
+    job_id = (await service.submit(CHAT))["job_id"]
+    run = asyncio.create_task(worker.run(job_id, user.id, CHAT))
+
+    # 실행 중에는 CHAT_JOB_ACTIVE_TTL이 지나도 자리가 남아 있어 제한을 넘지 않습니다.
+    await asyncio.sleep(0.5)
+    with pytest.raises(HTTPException) as error:
+        await service.submit(CHAT)
+    assert error.value.status_code == 429
+
+    await run
+    assert (await service.get(job_id))["status"] == JOB_DONE
+    assert await redis.hlen(user_jobs_key(user.id)) == 0
+
+
+async def test_job_expired_in_queue_is_not_run(redis, user, worker, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_JOB_ACTIVE_TTL", 0.2)
+    job_id = (await ChatJobService(user, redis).submit(CHAT))["job_id"]
+
+    await asyncio.sleep(0.3)
+    await worker.run(job_id, user.id, CHAT)
+    job = json.loads(await redis.get(job_key(job_id)))
+    assert job["status"] == JOB_FAILED and job["status_code"] == 503
+
+
+async def test_stop_fails_unfinished_jobs(redis, user, worker):
+    service = ChatJobService(user, redis)
+    job_ids = [(await service.submit(CHAT))["job_id"] for _ in range(2)]
+
+    await worker.stop()
+
+    for job_id in job_ids:
+        job = json.loads(await redis.get(job_key(job_id)))
+        assert job["status"] == JOB_FAILED and job["status_code"] == 503
+    assert await redis.hlen(user_jobs_key(user.id)) == 0
+
+
+async def test_invalid_request_is_rejected_without_slot(redis, user, worker):
+    with pytest.raises(HTTPException) as error:
+        await ChatJobService(user, redis).submit(CHAT.copy(update={"car": "없음"}))
+    assert error.value.status_code == 400
+    assert await redis.hlen(user_jobs_key(user.id)) == 0
@@ -0,0 +1,25 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_db, save_db
+from app.db.models import LikedHouse, User
+
+
+async def test_get_db_yields_async_session():
+    sessions = get_db()
+    db = await sessions.__anext__()
+    assert isinstance(db, AsyncSession)
+    await sessions.aclose()
+
+
+async def test_save_db_rolls_back_failed_commit(db, user):
+    with pytest.raises(HTTPException) as error:
+        await save_db(LikedHouse(user_id=user.id, house_id=999999), db)
+    assert error.value.status_code == 500
+
+    # 실패한 트랜잭션은 롤백되어 같은 세션을 계속 쓸 수 있습니다.
+    assert await db.scalar(select(func.count(LikedHouse.id))) == 0
+    saved = await save_db(User(nickname="other", hashed_password="x"), db)
+    assert saved.id is not None
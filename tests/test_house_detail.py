@@ -0,0 +1,47 @@
+import orjson
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.models import House
+from app.schemas.response import RawJSON, api_response
+
+
+def as_bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else value.encode()
+
+
+async def test_cached_detail_is_served_without_reparsing(client, redis, user, house_ids):
+    first = await client.get(f"/house/detail/{house_ids[0]}")
+    cached = as_bytes(await redis.get(f"house:{user.id}:{house_ids[0]}"))
+    second = await client.get(f"/house/detail/{house_ids[0]}")
+
+    # 캐시된 JSON을 파싱하지 않고 응답 본문에 그대로 넣습니다.
+    assert first.content == second.content
+    assert cached in second.content
+    body = second.json()
+    assert body["success"] is True and body["status_code"] == 2000
+    assert body["data"] == orjson.loads(cached) and body["data"]["id"] == house_ids[0]
+
+
+def test_api_response_wraps_raw_json_like_api_response():
+    response = api_response(RawJSON('{"a":[1,"가"]}'))
+    assert orjson.loads(response.body) == api_response({"a": [1, "가"]}).dict()
+
+
+async def test_batch_detail_keeps_order_and_fills_nulls(client, db, house_ids):
+    await db.execute(update(House).filter(House.id == house_ids[1]).values(is_deleted=True))
+    await db.commit()
+    # 일부는 캐시에서, 나머지는 db에서 읽습니다.
+    await client.get(f"/house/detail/{house_ids[2]}")
+
+    ids = [house_ids[2], 999999, house_ids[0], house_ids[1], house_ids[2]]
+    response = await client.get("/house/detail", params={"ids": ids})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [house and house["id"] for house in data] == [house_ids[2], None, house_ids[0], None, house_ids[2]]
+
+
+async def test_batch_detail_limits_ids(client, house_ids, monkeypatch):
+    monkeypatch.setattr(settings, "HOUSE_DETAIL_BATCH_MAX", 2)
+    response = await client.get("/house/detail", params={"ids": house_ids[:3]})
+    assert response.status_code == 400
@@ -0,0 +1,111 @@
+import random
+
+import orjson
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.models import House, Recommendation, User
+from app.schemas.request import Chat
+from app.service import recommender
+from app.service.chat import ChatService
+from app.service.auth import AuthService
+from app.service.house import HouseService, list_generation_key
+from app.service.like import toggle_like
+from bench.catalog import generate_house
+
+
+async def read_pages(client, url: str, size: int) -> list:
+    # next_cursor를 따라가며 모든 페이지의 id를 읽습니다.
+    pages, cursor = [], None
+    while True:
+        params = {"size": size} if cursor is None else {"size": size, "cursor": cursor}
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        pages.append([house["house_id"] for house in data["houses"]])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+async def test_house_list_cursor_chains_pages(client, house_ids):
+    assert await read_pages(client, "/house/list", 2) == [house_ids[0:2], house_ids[2:4], house_ids[4:]]
+    assert await read_pages(client, "/house/list", 5) == [house_ids]
+
+
+async def test_recommendation_list_cursor_chains_pages(client, db, user, house_ids):
+    # Recommendation.id 순서대로 페이지를 나눕니다.
+    order = [house_ids[3], house_ids[0], house_ids[4]]
+    db.add_all([Recommendation(user_id=user.id, house_id=house_id, reason="r") for house_id in order])
+    await db.commit()
+
+    assert await read_pages(client, "/house/recommendation/list", 2) == [order[:2], order[2:]]
+
+
+@pytest.mark.parametrize("url", ["/house/list", "/house/recommendation/list"])
+async def test_bad_cursor_is_rejected(client, house_ids, url):
+    response = await client.get(url, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def recommended_ids(client) -> list:
+    response = await client.get("/house/recommendation/list")
+    return [(house["house_id"], house["is_like"]) for house in response.json()["data"]["houses"]]
+
+
+async def test_like_invalidates_cached_lists(client, db, user, redis, house_ids):
+    db.add(Recommendation(user_id=user.id, house_id=house_ids[0], reason="r"))
+    await db.commit()
+    assert await recommended_ids(client) == [(house_ids[0], False)]
+
+    await client.patch(f"/house/like/{house_ids[0]}")
+    assert await redis.get(list_generation_key(user.id)) == "1"
+    assert await recommended_ids(client) == [(house_ids[0], True)]
+
+
+async def test_chat_invalidates_cached_lists(client, db, user, redis, house_ids, monkeypatch):
+    # 모든 집을 추천 후보 조건(도보 10분 이내, 주차 가능)에 맞춥니다.
+    await db.execute(update(House).values(walkTime=5, aptParkingCountPerHousehold=1.0))
+    await db.commit()
+    monkeypatch.setattr(settings, "HOUSE_INDEX_PATH", "")
+    monkeypatch.setattr(recommender, "_house_index", None)
+    assert await recommended_ids(client) == []
+
+    class StubReranker:
+        async def cached_rank(self, redis, persona, candidates):
+            return [candidates[0]["aptName"]], ["이유"]
+
+    chat_data = Chat(person_count="1명", period="1주", identity="학생", car="자차", child="아이 없음", significant="역")
+    result = await ChatService(db, user, redis, StubReranker()).chat(chat_data)
+
+    assert len(result["rank"]) == 1
+    assert await redis.get(list_generation_key(user.id)) == "1"
+    assert len(await recommended_ids(client)) == 1
+
+
+async def test_catalog_page_is_shared_and_likes_are_per_user(client, db, user, redis, house_ids):
+    other = User(nickname="other", hashed_password="x")
+    db.add(other)
+    await db.commit()
+    other_token = await AuthService(db, redis).create_token(other.nickname)
+    await toggle_like(redis, db, user.id, house_ids[0])
+
+    mine = (await client.get("/house/list", params={"size": 2})).json()["data"]["houses"]
+    theirs = (await client.get(
+        "/house/list", params={"size": 2}, headers={"Authorization": f"Bearer {other_token}"}
+    )).json()["data"]["houses"]
+
+    assert [house["is_like"] for house in mine] == [True, False]
+    assert [house["is_like"] for house in theirs] == [False, False]
+    # 좋아요 여부를 뺀 페이지 하나를 두 사용자가 함께 씁니다.
+    page = orjson.loads(await redis.get("houses:0:cursor::2"))
+    assert [house["house_id"] for house in page] == house_ids[:2]
+    assert all("is_like" not in house for house in page)
+
+
+async def test_new_house_invalidates_catalog_pages(client, db, user, redis, house_ids):
+    assert sum(await read_pages(client, "/house/list", 2), []) == house_ids
+
+    await HouseService(db, user, redis).create(generate_house(random.Random(1), 100, 3))
+    assert len(sum(await read_pages(client, "/house/list", 2), [])) == len(house_ids) + 1
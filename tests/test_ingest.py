@@ -0,0 +1,105 @@
+import json
+import random
+
+import pytest
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select, func, update
+
+from app.core.config import settings
+from app.db.models import House, CatalogRevision
+from app.service import recommender
+from app.service.house import HouseService
+from bench.catalog import generate_house
+
+
+def write_source(path, houses: list) -> None:
+    with open(path, 'w') as f:
+        for house in houses:
+            f.write(json.dumps(house, ensure_ascii=False) + "\n")
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    rng = random.Random(0)
+    houses = [generate_house(rng, house_id, 3) for house_id in range(5)]
+    path = tmp_path / "apartment_info.jsonl"
+    write_source(path, houses)
+    monkeypatch.setattr(settings, "HOUSE_DATA_PATH", str(path))
+    monkeypatch.setattr(recommender, "_house_index", None)
+    return path, houses
+
+
+async def revision(db) -> int:
+    return await db.scalar(select(CatalogRevision.revision).filter(CatalogRevision.id == 1))
+
+
+async def test_initailize_is_idempotent(db, redis, user, source):
+    service = HouseService(db, user, redis)
+
+    stats = await service.initailize()
+    assert stats["changed"] == 5
+    assert await db.scalar(select(func.count(House.id))) == 5
+    assert recommender._house_index is not None and len(recommender._house_index.houses) == 5
+    first_revision = await revision(db)
+
+    stats = await service.initailize()
+    assert stats["changed"] == 0
+    assert await db.scalar(select(func.count(House.id))) == 5
+    assert await revision(db) == first_revision
+
+
+async def test_initailize_updates_rows_with_same_source_id(db, redis, user, source):
+    path, houses = source
+    service = HouseService(db, user, redis)
+    await service.initailize()
+    first_revision = await revision(db)
+
+    # 원본에서 내용이 바뀐 매물은 새 행을 만들지 않고 기존 행을 갱신합니다.
+    houses[2]["walkTime"] = 99
+    write_source(path, houses)
+    stats = await service.initailize()
+
+    assert stats["changed"] == 1
+    assert await db.scalar(select(func.count(House.id))) == 5
+    assert await db.scalar(select(House.walkTime).filter(House.source_id == houses[2]["id"])) == 99
+    assert await revision(db) == first_revision + 1
+
+
+async def test_initailize_skips_duplicated_source_ids(db, redis, user, source):
+    path, houses = source
+    write_source(path, houses + [dict(houses[0], walkTime=1)])
+
+    stats = await HouseService(db, user, redis).initailize()
+
+    assert stats["duplicated"] == 1
+    assert await db.scalar(select(func.count(House.id))) == 5
+
+
+async def test_initailize_ignores_float_precision_noise(db, redis, user, source):
+    path, houses = source
+    service = HouseService(db, user, redis)
+    await service.initailize()
+    first_revision = await revision(db)
+
+    # MySQL FLOAT 컬럼처럼 단정밀도로 저장된 값도 같은 내용으로 봅니다.
+    house = next(house for house in houses if float(np.float32(house["studentCountPerTeacher"])) != house["studentCountPerTeacher"])
+    await db.execute(update(House).filter(House.source_id == house["id"]).values(
+        studentCountPerTeacher=float(np.float32(house["studentCountPerTeacher"]))
+    ))
+    await db.commit()
+
+    assert (await service.initailize())["changed"] == 0
+    assert await revision(db) == first_revision
+
+
+@pytest.mark.parametrize("house_info", [
+    {"x": 1},
+    dict(generate_house(random.Random(0), 0, 3), walkTime=None),
+    dict(generate_house(random.Random(0), 0, 3), establishmentYmd="2020-01-01"),
+])
+async def test_create_rejects_malformed_house(db, redis, user, house_info):
+    with pytest.raises(HTTPException) as error:
+        await HouseService(db, user, redis).create(house_info)
+    assert error.value.status_code == 400
+    assert await db.scalar(select(func.count(House.id))) == 0
@@ -0,0 +1,99 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.models import LikedHouse
+from app.service import like
+from app.service.house import HouseService
+from app.service.like import LikeFlusher, toggle_like, get_like_states, LIKES_DIRTY_KEY, LIKES_PROCESSING_KEY
+
+
+async def liked_rows(db) -> list:
+    rows = (await db.execute(select(LikedHouse.user_id, LikedHouse.house_id, LikedHouse.is_deleted))).all()
+    return sorted((row.user_id, row.house_id, row.is_deleted) for row in rows)
+
+
+@pytest.fixture
+def flusher(redis):
+    flusher = LikeFlusher(interval=60, batch_size=2)
+    flusher.redis = redis
+    return flusher
+
+
+async def test_toggle_is_visible_before_flush(db, redis, user, house_ids):
+    assert await toggle_like(redis, db, user.id, 1) is True
+    assert await toggle_like(redis, db, user.id, 2) is True
+    assert await toggle_like(redis, db, user.id, 2) is False
+
+    assert await get_like_states(redis, db, user.id, [1, 2, 3]) == [True, False, False]
+    assert await liked_rows(db) == []
+
+
+async def test_flush_persists_latest_state(db, redis, user, house_ids, flusher):
+    for house_id in [1, 2, 3, 3]:
+        await toggle_like(redis, db, user.id, house_id)
+
+    assert await flusher.flush() == 3
+    assert await liked_rows(db) == [(user.id, 1, False), (user.id, 2, False)]
+    assert not await redis.exists(LIKES_DIRTY_KEY, LIKES_PROCESSING_KEY)
+
+    # db에서 다시 읽어도 같은 상태입니다.
+    await redis.delete(like.likes_key(user.id))
+    await toggle_like(redis, db, user.id, 1)
+    await flusher.flush()
+    assert await get_like_states(redis, db, user.id, [1, 2]) == [False, True]
+    assert await liked_rows(db) == [(user.id, 1, True), (user.id, 2, False)]
+
+
+async def test_failed_flush_is_replayed(db, redis, user, house_ids, flusher, monkeypatch):
+    for house_id in [1, 2, 3, 4]:
+        await toggle_like(redis, db, user.id, house_id)
+
+    persist_likes = like.persist_likes
+    calls = []
+
+    async def fail_second_batch(session, changes):
+        calls.append(changes)
+        if len(calls) == 2:
+            raise RuntimeError("db down")
+        await persist_likes(session, changes)
+
+    monkeypatch.setattr(like, "persist_likes", fail_second_batch)
+    with pytest.raises(RuntimeError):
+        await flusher.flush()
+
+    # 저장하지 못한 변경은 processing 키에 남아 있습니다.
+    assert len(await redis.hgetall(LIKES_PROCESSING_KEY)) == 4
+    monkeypatch.setattr(like, "persist_likes", persist_likes)
+
+    # 실패한 뒤에 바뀐 값은 processing을 다시 저장한 다음에 반영되어 최신 값이 남습니다.
+    await toggle_like(redis, db, user.id, 1)
+    assert await flusher.flush() == 4
+    assert await redis.hgetall(LIKES_DIRTY_KEY) == {f"{user.id}:1": "0"}
+    assert not await redis.exists(LIKES_PROCESSING_KEY)
+    assert await flusher.flush() == 1
+
+    assert await liked_rows(db) == [(user.id, 1, True), (user.id, 2, False), (user.id, 3, False), (user.id, 4, False)]
+
+
+async def test_like_rejects_unknown_house(db, redis, user, house_ids):
+    with pytest.raises(HTTPException) as error:
+        await HouseService(db, user, redis).like(999999)
+    assert error.value.status_code == 404
+    assert not await redis.exists(LIKES_DIRTY_KEY)
+
+    assert await HouseService(db, user, redis).like(house_ids[0]) == {"is_like": True}
+
+
+async def test_unwritable_like_does_not_block_flush(db, redis, user, house_ids, flusher):
+    # 검증 전에 쌓였거나 그 사이 사라진 집의 좋아요는 건너뛰고 나머지를 저장합니다.
+    await redis.hset(LIKES_DIRTY_KEY, f"{user.id}:999999", "1")
+    await toggle_like(redis, db, user.id, 1)
+
+    assert await flusher.flush() == 2
+    assert not await redis.exists(LIKES_DIRTY_KEY, LIKES_PROCESSING_KEY)
+    assert await liked_rows(db) == [(user.id, 1, False)]
+
+    await toggle_like(redis, db, user.id, 2)
+    assert await flusher.flush() == 1
+    assert await liked_rows(db) == [(user.id, 1, False), (user.id, 2, False)]
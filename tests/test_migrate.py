@@ -0,0 +1,24 @@
+from sqlalchemy import inspect, text
+
+from app.cli.migrate import create_missing_indexes
+from app.db.database import engine
+
+
+def index_names(sync_conn, table_name: str) -> set:
+    return {index["name"] for index in inspect(sync_conn).get_indexes(table_name)}
+
+
+async def test_missing_indexes_are_created(db):
+    # 인덱스가 추가되기 전에 만들어진 db에서는 create_all이 인덱스를 만들지 않습니다.
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP INDEX ix_House_is_deleted_walkTime_parking"))
+        await conn.execute(text("DROP INDEX ix_Recommendation_user_id_house_id"))
+        await conn.execute(text("DROP INDEX ix_Recommendation_user_id_id"))
+
+    async with engine.begin() as conn:
+        created = await conn.run_sync(create_missing_indexes)
+        assert await conn.run_sync(create_missing_indexes) == []
+        assert "ix_House_is_deleted_walkTime_parking" in await conn.run_sync(index_names, "House")
+    assert sorted(created) == [
+        "ix_House_is_deleted_walkTime_parking", "ix_Recommendation_user_id_house_id", "ix_Recommendation_user_id_id"
+    ]
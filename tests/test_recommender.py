@@ -0,0 +1,152 @@
+import random
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.core.config import settings
+from app.db.models import House
+from app.service import recommender
+from app.service.house import HouseService, to_house_row
+from app.service.recommender import (
+    HouseIndex, HouseRecommender, vectorize_categorical_data, extract_room_count, bump_catalog_revision, get_catalog_version
+)
+from bench.catalog import generate_house, random_persona
+
+
+def baseline_recommend(houses: list, persona: dict, top_n: int = 3) -> list:
+    # 벡터화 이전의 HouseRecommender 구현입니다. 집마다 벡터를 만들어 코사인 유사도를 계산합니다.
+    tfidf_vectorizer = TfidfVectorizer()
+    tfidf_vectorizer.fit([
+        ' '.join(house['tagList']) + ' ' + house['articleFeatureDescription'] +
+        (" " + house['detailDescription'] if house['detailDescription'] != "없음" else "")
+        for house in houses
+    ])
+    categorical_vector = vectorize_categorical_data(persona)
+    persona_text_vector = tfidf_vectorizer.transform([persona['significant']]).toarray().flatten()
+    person_count = int(persona['person_count'].replace('명', '').split()[0])
+
+    house_list = []
+    selected_apt_names = set()
+    for house in houses:
+        if int(house['walkTime']) > 10 or float(house['aptParkingCountPerHousehold']) <= 0:
+            continue
+        if house['aptName'] in selected_apt_names:
+            continue
+        house_text = house['articleFeatureDescription'] + ' ' + ' '.join(house['tagList']) + (
+            " " + house['detailDescription'] if house['detailDescription'] != "없음" else "")
+        house_text_vector = tfidf_vectorizer.transform([house_text]).toarray().flatten()
+        house_vector = np.concatenate([categorical_vector, house_text_vector, [extract_room_count(house) - person_count]])
+        persona_vector = np.concatenate([categorical_vector, persona_text_vector, [0]])
+        house_list.append((cosine_similarity([house_vector], [persona_vector])[0][0], house))
+        selected_apt_names.add(house['aptName'])
+
+    house_list.sort(key=lambda x: x[0], reverse=True)
+    return house_list[:top_n]
+
+
+@pytest.fixture(scope="module")
+def houses():
+    rng = random.Random(7)
+    houses = []
+    for house_id in range(300):
+        house = to_house_row(generate_house(rng, house_id, 40))
+        house["id"] = house_id + 1
+        houses.append(house)
+    return houses
+
+
+@pytest.fixture(scope="module")
+def personas():
+    rng = random.Random(11)
+    return [random_persona(rng) for _ in range(50)]
+
+
+def assert_same_recommendations(result: list, expected: list) -> None:
+    assert [house['id'] for _, house in result] == [house['id'] for _, house in expected]
+    np.testing.assert_allclose([score for score, _ in result], [score for score, _ in expected], rtol=1e-6)
+
+
+def test_scores_match_baseline(houses, personas):
+    recommender = HouseRecommender(HouseIndex.build(houses))
+    for persona in personas:
+        result = recommender.recommend(persona)
+        baseline = baseline_recommend(houses, persona, top_n=len(houses))
+        baseline_scores = {house['id']: score for score, house in baseline}
+        # 점수 표는 float32라서 점수가 거의 같은 집끼리는 순서가 바뀔 수 있으므로, 집마다 기존 점수와 비교합니다.
+        np.testing.assert_allclose([score for score, _ in result], [score for score, _ in baseline[:3]], rtol=1e-6)
+        np.testing.assert_allclose(
+            [score for score, _ in result], [baseline_scores[house['id']] for _, house in result], rtol=1e-6
+        )
+
+
+def test_saved_index_gives_same_results(houses, personas, tmp_path):
+    house_index = HouseIndex.build(houses)
+    version = house_index.save(str(tmp_path))
+    loaded = HouseIndex.load(str(tmp_path))
+
+    assert loaded.artifact_version == version
+    assert loaded.catalog_version == house_index.catalog_version
+    for persona in personas:
+        assert_same_recommendations(
+            HouseRecommender(loaded).recommend(persona), HouseRecommender(house_index).recommend(persona)
+        )
+
+
+def test_incremental_add_matches_full_arrays(houses, personas):
+    house_index = HouseIndex.build(houses[:250])
+    for house in houses[250:260]:
+        house_index.add(house, "test")
+    # 이미 있는 집을 다시 넣으면 그 행만 바뀝니다.
+    house_index.add(dict(houses[0], walkTime=99), "test")
+
+    expected = HouseIndex(house_index.tfidf_vectorizer, house_index.matrix.copy(), list(house_index.houses))
+    for name in ["ids", "room_counts", "eligible"]:
+        np.testing.assert_array_equal(getattr(house_index, name), getattr(expected, name))
+    np.testing.assert_allclose(house_index.text_norms, expected.text_norms)
+    np.testing.assert_allclose(house_index.inverse_house_norms, expected.inverse_house_norms, rtol=1e-6)
+    assert house_index.inverse_house_norms.dtype == np.float32
+    assert not house_index.eligible[house_index.positions[houses[0]['id']]]
+
+    for persona in personas:
+        assert_same_recommendations(
+            HouseRecommender(house_index).recommend(persona), HouseRecommender(expected).recommend(persona)
+        )
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+async def test_create_does_not_lose_houses_added_elsewhere(db, redis, user, house_ids, tmp_path, monkeypatch, on_disk):
+    monkeypatch.setattr(settings, "HOUSE_INDEX_PATH", str(tmp_path) if on_disk else "")
+    monkeypatch.setattr(recommender, "_house_index", None)
+    await recommender.load_house_index(db)
+    rng = random.Random(3)
+    service = HouseService(db, user, redis)
+
+    refresh_house_index = recommender.refresh_house_index
+    refreshes = []
+
+    async def count_refreshes(session):
+        refreshes.append(session)
+        return await refresh_house_index(session)
+
+    monkeypatch.setattr(recommender, "refresh_house_index", count_refreshes)
+
+    # 이 워커의 인덱스가 최신이면 전체를 다시 만들지 않고 새 집만 추가합니다.
+    await service.create(generate_house(rng, 100, 3))
+    assert refreshes == []
+
+    # 다른 워커가 추가한 집은 이 워커의 인덱스에 없으므로, 다음 추가에서 전체를 다시 만듭니다.
+    other = House(**to_house_row(generate_house(rng, 101, 3)))
+    await bump_catalog_revision(db)
+    db.add(other)
+    await db.commit()
+    await service.create(generate_house(rng, 102, 3))
+    assert len(refreshes) == 1
+
+    house_index = recommender._house_index
+    assert house_index.catalog_version == await get_catalog_version(db)
+    assert len(house_index.houses) == len(house_ids) + 3
+    assert other.id in house_index.positions
+    if on_disk:
+        assert other.id in HouseIndex.load(str(tmp_path)).positions
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.service.reranker import RerankerClient, CircuitBreaker, rerank_cache_key
+
+CANDIDATES = [{"aptName": "A"}, {"aptName": "B"}]
+PERSONA = {"significant": ""}
+
+
+class StubClient:
+    # httpx.AsyncClient 대신 mode에 따라 응답하거나 실패합니다.
+    is_closed = False
+
+    def __init__(self, mode: str = "ok", text: str = 'rank: ["A"] reason: ["r"]'):
+        self.mode = mode
+        self.text = text
+        self.calls = 0
+
+    async def post(self, url, json):
+        self.calls += 1
+        if self.mode == "down":
+            raise httpx.ConnectError("down")
+        if self.mode == "bug":
+            raise ValueError("bug")
+        if self.mode == "hang":
+            await asyncio.sleep(10)
+        return httpx.Response(200, text=self.text, request=httpx.Request("POST", url))
+
+
+def make_client(stub: StubClient, threshold: int = 1, reset_timeout: float = 0.05, retries: int = 1) -> RerankerClient:
+    client = RerankerClient(
+        url="http://reranker.test/",
+        connect_timeout=1,
+        read_timeout=1,
+        max_connections=1,
+        max_retries=retries,
+        backoff_base=0,
+        backoff_max=0,
+        circuit_breaker=CircuitBreaker(threshold, reset_timeout),
+        cache_ttl=60,
+        lock_ttl=1,
+        lock_poll_interval=0.01,
+    )
+    client.client = stub
+    return client
+
+
+async def open_breaker(client: RerankerClient) -> None:
+    mode = client.client.mode
+    client.client.mode = "down"
+    with pytest.raises(HTTPException):
+        await client.rank(PERSONA, CANDIDATES)
+    client.client.mode = mode
+    assert client.circuit_breaker.state == "open"
+
+
+async def test_breaker_rejects_while_open_and_recovers_after_trial():
+    client = make_client(StubClient())
+    await open_breaker(client)
+
+    with pytest.raises(HTTPException) as error:
+        await client.rank(PERSONA, CANDIDATES)
+    assert error.value.status_code == 503
+    assert client.client.calls == 1
+
+    await asyncio.sleep(0.06)
+    assert client.circuit_breaker.state == "half-open"
+    assert await client.rank(PERSONA, CANDIDATES) == (["A"], ["r"])
+    assert client.circuit_breaker.state == "closed"
+
+
+async def test_failed_trial_reopens_breaker():
+    client = make_client(StubClient(), threshold=3)
+    client.circuit_breaker.opened_at = 0
+    assert client.circuit_breaker.state == "half-open"
+
+    client.client.mode = "down"
+    with pytest.raises(HTTPException):
+        await client.rank(PERSONA, CANDIDATES)
+    assert client.circuit_breaker.state == "open"
+
+
+async def test_cancelled_trial_releases_half_open_slot():
+    client = make_client(StubClient(mode="hang"))
+    await open_breaker(client)
+    await asyncio.sleep(0.06)
+
+    task = asyncio.create_task(client.rank(PERSONA, CANDIDATES))
+    await asyncio.sleep(0.01)
+    assert client.circuit_breaker.trial_in_flight
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert not client.circuit_breaker.trial_in_flight
+    client.client.mode = "ok"
+    assert await client.rank(PERSONA, CANDIDATES) == (["A"], ["r"])
+
+
+async def test_unexpected_error_counts_as_failure():
+    client = make_client(StubClient(mode="bug"))
+    with pytest.raises(ValueError):
+        await client.rank(PERSONA, CANDIDATES)
+    assert client.circuit_breaker.state == "open"
+    assert not client.circuit_breaker.trial_in_flight
+
+
+async def test_unknown_names_are_dropped_before_caching(redis):
+    client = make_client(StubClient(text='rank: ["X", "B"] reason: ["rx", "rb"]'))
+
+    assert await client.cached_rank(redis, PERSONA, CANDIDATES) == (["B"], ["rb"])
+    assert json.loads(await redis.get(rerank_cache_key(PERSONA, CANDIDATES))) == [["B"], ["rb"]]
+
+
+async def test_response_without_known_names_is_not_cached(redis):
+    client = make_client(StubClient(text='rank: ["X"] reason: ["rx"]'), retries=2)
+
+    with pytest.raises(HTTPException):
+        await client.cached_rank(redis, PERSONA, CANDIDATES)
+    assert client.client.calls == 2
+    assert await redis.get(rerank_cache_key(PERSONA, CANDIDATES)) is None
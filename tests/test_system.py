@@ -0,0 +1,46 @@
+import pytest
+
+import main
+from app.core.config import settings
+from app.core.health import Readiness
+from app.router import system
+from app.service import recommender
+
+
+@pytest.fixture
+def readiness(monkeypatch):
+    # 다른 테스트와 상태를 나누지 않도록 새 준비 상태를 씁니다.
+    state = Readiness()
+    monkeypatch.setattr(main, "readiness", state)
+    monkeypatch.setattr(system, "readiness", state)
+    monkeypatch.setattr(recommender, "_house_index", None)
+    return state
+
+
+async def test_ready_only_after_warmup(client, readiness, house_ids):
+    assert (await client.get("/system/live")).status_code == 200
+    assert (await client.get("/system/ready")).status_code == 503
+
+    await main.warmup()
+
+    response = await client.get("/system/ready")
+    assert response.status_code == 200
+    assert response.json()["data"]["checks"] == {"db": True, "redis": True, "house_index": True, "recommender": True}
+
+
+async def test_warmup_retries_until_db_is_ready(readiness, house_ids, monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_RETRY_INTERVAL", 0.01)
+    ping_db = main.ping_db
+    calls = []
+
+    async def flaky_ping_db():
+        calls.append(len(calls))
+        if len(calls) < 3:
+            raise ConnectionError("db not ready")
+        await ping_db()
+
+    monkeypatch.setattr(main, "ping_db", flaky_ping_db)
+    await main.warmup()
+
+    assert readiness.ready and len(calls) == 3
+    assert readiness.last_error is None